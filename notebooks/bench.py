@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Time the tutorial pipelines against the local stand-in, and keep the numbers.
+
+The tutorials quote timings, such as thirteen seconds to synthesize ninety
+seconds of speech, that nobody can reproduce and nothing tracks. This runs the
+pages' own functions, taken from their code blocks with the same parser
+`build.py` uses, against `mock_api.py` with injected latency, and sweeps the
+knobs that decide how they scale: chunk size, worker count, corpus size,
+chunk count and the number of lists an approximate search reads.
+
+Only a page's top-level statements are loaded, never its `if __name__`
+entry points or loops: imports, functions, classes, assignments and calls
+such as the one creating the research notebook's cache table. Statements that
+fail, usually because they need something the page only creates
+interactively such as the `script` it narrates, are skipped. Every case runs
+in a fresh namespace and scratch directory, so the on-disk caches the
+tutorials keep start cold unless the case says otherwise.
+
+Results are written as JSON with stable ordering, one entry per case, so two
+runs can be diffed. `--compare` does that and exits non-zero when any case got
+slower by more than `--tolerance`.
+
+Usage: python notebooks/bench.py [--quick] [--repeat 3] [--only narrate ...]
+           [--json bench.json] [--compare old.json] [mock_api.py options]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import contextlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import wave
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+from build import REPO, code_blocks, page_blocks
+from snippets import english_pages, python_blocks
+
+import mock_api
+
+NARRATION = "guides/media/article-narration.mdx"
+RESEARCH = "learn/audio-research-notebook.mdx"
+NOISE = 0.001  # seconds; smaller differences are not reported as changes
+KEEP = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+        ast.Assign, ast.AnnAssign, ast.Expr)
+
+
+def definitions(page: str, base_url: str) -> list:
+    """A page's top-level statements, compiled one at a time."""
+    statements = []
+    for block in python_blocks(page):
+        code = block.code.replace(mock_api.LIVE_URL, base_url)
+        for node in ast.parse(code).body:
+            if isinstance(node, KEEP):
+                module = ast.Module(body=[node], type_ignores=[])
+                statements.append(compile(module, f"{page}:{block.line + node.lineno}", "exec"))
+    return statements
+
+
+def load(statements: list) -> dict:
+    namespace: dict = {"__name__": "bench"}
+    for statement in statements:
+        try:
+            exec(statement, namespace)
+        except Exception:
+            pass
+    return namespace
+
+
+def text(seed: str, chars: int) -> str:
+    """Prose of about `chars` characters, in paragraphs of short sentences."""
+    return mock_api.filler(seed, chars)
+
+
+# --------------------------------------------------------------------------
+# Cases. Each gets a fresh namespace for its page and returns what it measured.
+# --------------------------------------------------------------------------
+
+
+def split_into_chunks_case(ns: dict, max_chars: int, script_chars: int) -> dict:
+    script = text("script", script_chars)
+    started = time.perf_counter()
+    chunks = ns["split_into_chunks"](script, max_chars)
+    return {"seconds": time.perf_counter() - started, "chunks": len(chunks)}
+
+
+def split_case(ns: dict, corpus_chars: int) -> dict:
+    corpus = text("corpus", corpus_chars)
+    started = time.perf_counter()
+    chunks = ns["split"](corpus)
+    return {"seconds": time.perf_counter() - started, "chunks": len(chunks)}
+
+
+def narrate_case(ns: dict, max_chars: int, workers: int, script_chars: int) -> dict:
+    script = text("script", script_chars)
+    ns["split_into_chunks"] = partial(ns["split_into_chunks"], max_chars=max_chars)
+    ns["SCHEDULER"] = ns["Scheduler"](start=workers, ceiling=workers)
+    ns["sample_rate"]()
+    ns["check_voice"]()
+    with contextlib.redirect_stderr(None):
+        started = time.perf_counter()
+        ns["narrate"](script, "bench.wav", window=workers)
+        seconds = time.perf_counter() - started
+    with wave.open("bench.wav") as out:
+        audio = out.getnframes() / out.getframerate()
+    return {"seconds": seconds, "chunks": len(ns["split_into_chunks"](script)), "audio_seconds": audio}
+
+
+def audio_overview_case(ns: dict, turns: int, workers: int) -> dict:
+    hosts = list(ns["HOSTS"])
+    dialogue = [{"speaker": hosts[n % len(hosts)], "text": text(f"turn {n}", 80 + 60 * (n % 5))}
+                for n in range(turns)]
+    started = time.perf_counter()
+    ns["audio_overview"](dialogue, "bench.wav", workers=workers)
+    seconds = time.perf_counter() - started
+    with wave.open("bench.wav") as out:
+        audio = out.getnframes() / out.getframerate()
+    return {"seconds": seconds, "audio_seconds": audio}
+
+
+def embed_case(ns: dict, texts: int, cache: str) -> dict:
+    inputs = [text(f"chunk {n}", 600) for n in range(texts)]
+    if cache == "warm":
+        ns["embed"](inputs)
+    started = time.perf_counter()
+    ns["embed"](inputs)
+    return {"seconds": time.perf_counter() - started}
+
+
+def retrieve_case(ns: dict, chunks: int, queries: int = 20) -> dict:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((chunks, 1024), dtype=np.float32)
+    ns["vectors"] = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    ns["chunks"][:] = [{"source": 1, "title": "bench", "text": str(n)} for n in range(chunks)]
+    question = "How does Venice keep prompts private?"
+    ns["embed"]([question])
+    started = time.perf_counter()
+    for _ in range(queries):
+        ns["retrieve"](question)
+    return {"seconds": (time.perf_counter() - started) / queries}
+
+
+def ann_case(ns: dict, chunks: int, probes: int, queries: int = 20) -> dict:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((chunks, 1024), dtype=np.float32)
+    ns["vectors"] = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    ns["chunks"][:] = [{"source": 1, "title": "bench", "text": str(n)} for n in range(chunks)]
+    ns["ann"] = ns["AnnIndex"].build(probes=probes)
+    question = "How does Venice keep prompts private?"
+    ns["embed"]([question])
+    started = time.perf_counter()
+    for _ in range(queries):
+        ns["retrieve"](question)
+    return {"seconds": (time.perf_counter() - started) / queries,
+            "lists": len(ns["ann"].centroids)}
+
+
+def code_blocks_case(ns: dict, pages: int) -> dict:
+    chosen = english_pages()[:pages]
+    page_blocks.cache_clear()
+    started = time.perf_counter()
+    found = sum(len(b) for page in chosen for b in code_blocks(REPO / page).values())
+    return {"seconds": time.perf_counter() - started, "pages": len(chosen), "blocks": found}
+
+
+# name: (page or None, case, full sweep, quick sweep)
+BENCHES: dict[str, tuple[str | None, Callable[..., dict], dict, dict]] = {
+    "split_into_chunks": (
+        NARRATION, split_into_chunks_case,
+        {"max_chars": [500, 1500, 4000], "script_chars": [5_000, 50_000, 500_000]},
+        {"max_chars": [1500], "script_chars": [50_000]},
+    ),
+    "split": (
+        RESEARCH, split_case,
+        {"corpus_chars": [10_000, 100_000, 1_000_000]},
+        {"corpus_chars": [100_000]},
+    ),
+    "narrate": (
+        NARRATION, narrate_case,
+        {"max_chars": [750, 1500, 3000], "workers": [1, 4, 8], "script_chars": [6_000, 30_000]},
+        {"max_chars": [1500], "workers": [1, 4], "script_chars": [6_000]},
+    ),
+    "audio_overview": (
+        RESEARCH, audio_overview_case,
+        {"turns": [8, 24], "workers": [1, 4, 8]},
+        {"turns": [8], "workers": [4]},
+    ),
+    "embed": (
+        RESEARCH, embed_case,
+        {"texts": [64, 512], "cache": ["cold", "warm"]},
+        {"texts": [64], "cache": ["cold", "warm"]},
+    ),
+    "retrieve": (
+        RESEARCH, retrieve_case,
+        {"chunks": [1_000, 10_000, 100_000]},
+        {"chunks": [10_000]},
+    ),
+    "ann": (
+        RESEARCH, ann_case,
+        {"chunks": [10_000, 100_000], "probes": [8, 32]},
+        {"chunks": [10_000], "probes": [8]},
+    ),
+    "code_blocks": (
+        None, code_blocks_case,
+        {"pages": [10, 100, 1_000]},
+        {"pages": [100]},
+    ),
+}
+
+
+def cases(names: list[str], quick: bool):
+    for name in names:
+        page, case, full, short = BENCHES[name]
+        sweep = short if quick else full
+        for values in itertools.product(*sweep.values()):
+            yield name, page, case, dict(zip(sweep, values))
+
+
+def measure(statements: list, case: Callable[..., dict], params: dict, repeat: int) -> dict:
+    runs = []
+    home = os.getcwd()
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="bench-") as scratch:
+            os.chdir(scratch)
+            try:
+                with contextlib.redirect_stdout(None):
+                    namespace = load(statements)
+                    runs.append(case(namespace, **params))
+            finally:
+                os.chdir(home)
+    seconds = [run.pop("seconds") for run in runs]
+    result = {"seconds": round(statistics.median(seconds), 6),
+              "min": round(min(seconds), 6), "max": round(max(seconds), 6)}
+    return result | {key: round(value, 3) if isinstance(value, float) else value
+                     for key, value in runs[-1].items()}
+
+
+def commit() -> str:
+    head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                          capture_output=True, text=True)
+    return head.stdout.strip() or "unknown"
+
+
+def label(params: dict) -> str:
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def compare(old: dict, new: dict, tolerance: float) -> int:
+    """Print each case's change against `old`, and count those beyond `tolerance`."""
+    def key(result: dict) -> tuple[str, str]:
+        return result["bench"], json.dumps(result["params"], sort_keys=True)
+
+    before = {key(r): r["seconds"] for r in old["results"] if "seconds" in r}
+    slower = 0
+    for result in new["results"]:
+        was = before.get(key(result))
+        if not was or "seconds" not in result:
+            continue
+        ratio = result["seconds"] / was
+        changed = abs(result["seconds"] - was) > NOISE
+        flag = ""
+        if changed and ratio > 1 + tolerance:
+            flag, slower = "  SLOWER", slower + 1
+        elif changed and ratio < 1 / (1 + tolerance):
+            flag = "  faster"
+        print(f"{ratio:6.2f}x  {result['bench']:18} {label(result['params'])}{flag}")
+    print(f"\n{slower} case(s) slower than {old['meta']['commit']} by more than {tolerance:.0%}")
+    return slower
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHES), help="benchmarks to run")
+    parser.add_argument("--quick", action="store_true", help="one or two points per sweep")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the median is kept")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--compare", type=Path, help="results from an earlier run to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative slowdown that --compare reports as a failure")
+    mock_api.add_options(parser)
+    parser.set_defaults(latency=["0.05"], speech_rtf=0.02)
+    args = parser.parse_args()
+
+    options = mock_api.options_from(args)
+    server = mock_api.serve(options=options)
+    base_url = mock_api.base_url(server)
+    os.environ.setdefault("VENICE_API_KEY", "bench-key")
+
+    loaded: dict[str, list] = {}
+    results: list[dict[str, Any]] = []
+    for name, page, case, params in cases(args.only or list(BENCHES), args.quick):
+        if page and page not in loaded:
+            loaded[page] = definitions(page, base_url)
+        result = {"bench": name, "params": params}
+        try:
+            result |= measure(loaded.get(page, []), case, params, args.repeat)
+        except Exception as error:
+            result["error"] = f"{type(error).__name__}: {error}"[:300]
+        results.append(result)
+        shown = f"{result['seconds']:10.4f}s" if "seconds" in result else f"  {result['error']}"
+        print(f"{name:18} {label(params):40} {shown}", flush=True)
+    server.shutdown()
+
+    report = {
+        "meta": {
+            "commit": commit(),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "mock": {"latency": options.latency, "speech_rtf": options.speech_rtf,
+                     "sample_rate": options.sample_rate},
+        },
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+    failed = sum("error" in r for r in results)
+    if args.compare:
+        old = json.loads(args.compare.read_text(encoding="utf-8"))
+        failed += compare(old, report, args.tolerance)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,35 +13,166 @@ module, and guards its entry point behind `__main__`. Cells marked `extra` cover
 those gaps and the things that only make sense in Colab, such as reading the key
 from Colab secrets and playing the audio back inline.
 
-Usage: python notebooks/build.py [--check]
+Each build records what it was built from in `notebooks/manifest.json`: a hash
+of the source page, of the cell spec, of this file, and of the notebook it
+wrote. A notebook whose inputs and output still match the manifest is skipped
+without reading the page, which keeps `--check` near instant in hooks and CI.
+A translation that lags its English page is recorded too, against the hashes
+of both pages, so it is not rendered again until one of them changes. `--check`
+reports how many notebooks lag and fails on one the manifest does not know of.
+
+`--check` also validates the JSON body of every request the English pages'
+Python snippets send against `swagger.yaml`, through `payloads.py`, so a page
+that drifts from the API fails the same run.
+
+With `--execute`, every notebook is then run top to bottom against the local
+stand-in in `mock_api.py`, and the executed copies, outputs included, are
+written under `notebooks/executed/`. The committed notebooks stay stripped.
+`--record` executes the same way while `cassette.py` records every notebook's
+traffic, from `--upstream` when that names the live API, and `--replay` executes
+against those recordings with no network at all. `--round-trip` records each
+English notebook against the stand-in and replays it at once, failing if one
+does not run or the replay asks for anything the recording does not hold; a
+notebook that passed is not run again until it or the tools change.
+
+Usage: python notebooks/build.py [--check] [--force] [--execute]
+           [--record [--upstream URL] | --replay | --round-trip]
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
+import io
 import json
+import os
 import re
 import sys
+import time
+import tokenize
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 REPO = Path(__file__).resolve().parent.parent
 DOCS_URL = "https://docs.venice.ai"
 GITHUB_REPO = "veniceai/api-docs"
+MANIFEST = REPO / "notebooks" / "manifest.json"
+EXECUTED = REPO / "notebooks" / "executed"
+
+
+FENCE = re.compile(r"^(\s*)(`{3,})([^`\s]*)[ \t]*(.*?)\s*$")
+HEADING = re.compile(r"^(#{2,3}) (.+)$")
+# An MDX snippet shared between pages, and the tag that places it.
+SNIPPET = re.compile(r'^import (\w+) from "/(snippets/[^"]+\.mdx)";?\s*$', re.MULTILINE)
+COMPONENT = re.compile(r"^\s*<(\w+)\s*/>\s*$")
+
+
+class Block:
+    """One fenced code block, with where it sits on the page."""
+
+    def __init__(self, lang: str, title: str, section: str, subsection: str, line: int, code: str):
+        self.lang, self.title, self.line, self.code = lang, title, line, code
+        self.section, self.subsection = section, subsection
+
+
+class Section:
+    """A page's text from one `##` or `###` heading to the next.
+
+    The first, at level 0 and untitled, holds whatever precedes the first
+    heading. `lines` is the text outside fences, and `blocks` the fenced code.
+    """
+
+    def __init__(self, level: int, title: str, line: int):
+        self.level, self.title, self.line = level, title, line
+        self.lines: list[str] = []
+        self.blocks: list[Block] = []
+
+
+def sections(src: str) -> list[Section]:
+    """Walk a page once, splitting it at its headings and collecting every fenced block.
+
+    Headings are only recognised outside fences, so a `## ` comment in a code
+    sample cannot start a section. A fence closes on a run of at least as many
+    backticks as opened it, which lets four-backtick fences quote three.
+    Indented fences, such as those inside `<Steps>`, lose their indentation.
+    Frontmatter belongs to no section.
+
+    A page that imports an MDX snippet from `snippets/` gets the snippet's blocks
+    where its tag stands, in the page's current section and numbered with the
+    tag's line, so code shared between pages still runs in each of them.
+    """
+    found = [Section(0, "", 1)]
+    section, subsection = "(intro)", ""
+    fence: tuple[str, str, str, str, int] | None = None
+    body: list[str] = []
+    imported = dict(SNIPPET.findall(src))
+
+    lines = src.splitlines()
+    start = lines.index("---", 1) + 1 if lines[:1] == ["---"] and "---" in lines[1:] else 0
+    for number, line in enumerate(lines[start:], start + 1):
+        if fence is None:
+            opening = FENCE.match(line)
+            if opening:
+                indent, ticks, lang, title = opening.groups()
+                fence, body = (indent, ticks, lang.lower(), title, number), []
+                continue
+            heading = HEADING.match(line)
+            if heading:
+                level, title = len(heading.group(1)), heading.group(2).strip()
+                if level == 2:
+                    section, subsection = title, ""
+                else:
+                    subsection = title
+                found.append(Section(level, title, number))
+                continue
+            tag = COMPONENT.match(line)
+            if tag and tag.group(1) in imported:
+                found[-1].blocks.extend(
+                    Block(b.lang, b.title, section, subsection, number, b.code)
+                    for b in snippet_blocks(imported[tag.group(1)])
+                )
+            found[-1].lines.append(line)
+            continue
+
+        indent, ticks, lang, title, opened = fence
+        if line.strip().startswith(ticks) and not line.strip().strip("`"):
+            code = "\n".join(body).rstrip()
+            found[-1].blocks.append(Block(lang, title, section, subsection, opened, code))
+            fence = None
+            continue
+        body.append(line[len(indent):] if line.startswith(indent) else line.lstrip())
+
+    return found
+
+
+def scan(src: str) -> list[Block]:
+    """Every fenced block on a page, in order, as `sections` finds them."""
+    return [block for part in sections(src) for block in part.blocks]
+
 
+@functools.lru_cache(maxsize=None)
+def snippet_blocks(path: str) -> tuple[Block, ...]:
+    return tuple(scan((REPO / path).read_text(encoding="utf-8")))
 
-def code_blocks(mdx: Path) -> dict[str, list[str]]:
-    """Return the Python blocks on a page, grouped by their enclosing heading."""
-    src = mdx.read_text(encoding="utf-8")
-    headings = [(m.start(), m.group(1).strip()) for m in re.finditer(r"^## (.+)$", src, re.M)]
 
+def sources(page: Path) -> list[Path]:
+    """The page and every snippet it imports: everything its blocks are read from."""
+    return [page] + [REPO / path for _, path in SNIPPET.findall(page.read_text(encoding="utf-8"))]
+
+
+@functools.lru_cache(maxsize=None)
+def page_blocks(mdx: Path) -> tuple[Block, ...]:
+    """The block table for a page, parsed once per run however often it is asked for."""
+    return tuple(scan(mdx.read_text(encoding="utf-8")))
+
+
+def code_blocks(mdx: Path, lang: str = "python") -> dict[str, list[str]]:
+    """Return the blocks of one language on a page, grouped by their enclosing heading."""
     blocks: dict[str, list[str]] = {}
-    for match in re.finditer(r"```python[^\n]*\n(.*?)```", src, re.S):
-        section = "(intro)"
-        for start, name in headings:
-            if start > match.start():
-                break
-            section = name
-        blocks.setdefault(section, []).append(match.group(1).rstrip())
+    for block in page_blocks(mdx):
+        if block.lang == lang:
+            blocks.setdefault(block.section, []).append(block.code)
     return blocks
 
 
@@ -63,23 +194,39 @@ def mdx(section: str, index: int = 0, drop: tuple[str, ...] = ()) -> Cell:
     return Cell("mdx", f"{section}\u0000{index}", drop)
 
 
-def resolve(cells: list[Cell], blocks: dict[str, list[str]], page: str) -> list[tuple[str, str]]:
+class Mismatch(SystemExit):
+    """A page no longer has the section or block a cell spec points at."""
+
+
+def resolve(
+    cells: list[Cell],
+    blocks: dict[str, list[str]],
+    page: str,
+    sections: dict[str, str] | None = None,
+) -> list[tuple[str, str]]:
+    """Turn a cell spec into notebook cells, pulling `mdx()` code from `blocks`.
+
+    Anchors are always written against the English page. `sections` maps those
+    titles to the headings of a translated page, and anything it does not name
+    is looked up as written.
+    """
     out: list[tuple[str, str]] = []
     for cell in cells:
         if cell.kind != "mdx":
             out.append(("markdown" if cell.kind == "markdown" else "code", cell.body))
             continue
 
-        section, raw_index = cell.body.split("\u0000")
+        anchor, raw_index = cell.body.split("\u0000")
+        section = (sections or {}).get(anchor, anchor)
         index = int(raw_index)
         if section not in blocks:
-            raise SystemExit(
+            raise Mismatch(
                 f"{page}: no section titled {section!r}.\n"
                 f"  available: {sorted(blocks)}\n"
                 f"  Update notebooks/build.py to match the rewritten page."
             )
         if index >= len(blocks[section]):
-            raise SystemExit(
+            raise Mismatch(
                 f"{page}: section {section!r} has {len(blocks[section])} Python block(s), "
                 f"needed index {index}.\n  Update notebooks/build.py to match the rewritten page."
             )
@@ -87,12 +234,48 @@ def resolve(cells: list[Cell], blocks: dict[str, list[str]], page: str) -> list[
         code = blocks[section][index]
         for line in cell.drop:
             if line not in code:
-                raise SystemExit(f"{page}: expected to drop {line!r} from {section!r}, not found.")
+                raise Mismatch(f"{page}: expected to drop {line!r} from {section!r}, not found.")
             code = "\n".join(l for l in code.splitlines() if l.strip() != line.strip())
         out.append(("code", code.strip("\n")))
     return out
 
 
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint(pages: list[str], cells: list[Cell]) -> dict[str, str]:
+    """Hash everything a notebook is built from, without parsing any of it.
+
+    A translated notebook depends on the English page as well as its own,
+    because its anchors are resolved through the English headings, and every
+    page depends on the snippets it imports.
+    """
+    spec = json.dumps([[c.kind, c.body, list(c.drop)] for c in cells], ensure_ascii=False)
+    files = [path for page in pages for path in sources(REPO / page)]
+    return {
+        "page": digest(b"".join(digest(path.read_bytes()).encode() for path in files)),
+        "cells": digest(spec.encode("utf-8")),
+        "build": digest(Path(__file__).resolve().read_bytes()),
+    }
+
+
+def load_manifest() -> dict[str, dict[str, str]]:
+    if not MANIFEST.exists():
+        return {}
+    try:
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def fresh(entry: dict[str, str] | None, inputs: dict[str, str], target: Path) -> bool:
+    """True when the manifest says `target` was built from exactly these inputs."""
+    if not entry or any(entry.get(key) != value for key, value in inputs.items()):
+        return False
+    return target.exists() and digest(target.read_bytes()) == entry.get("notebook")
+
+
 def notebook(cells: list[tuple[str, str]]) -> dict:
     def cell(kind: str, source: str) -> dict:
         base = {"cell_type": kind, "metadata": {}, "source": source.splitlines(keepends=True)}
@@ -222,15 +405,35 @@ NARRATION = [
         "module writes the header for us."
     ),
     mdx("4. Join the chunks into one file"),
+    md(
+        "Calling `requests.post` directly opens a new connection every time, so every chunk "
+        "would pay a TCP and TLS handshake. `SESSION` keeps connections alive, with a pool as "
+        "large as the scheduler's ceiling, and `request` sends everything through it. `TRAFFIC` "
+        "records each request per endpoint: bytes each way, and total time and time to first "
+        "byte as histograms."
+    ),
+    mdx("4. Join the chunks into one file", 1),
+    mdx("4. Join the chunks into one file", 2),
+    md(
+        "Every request asks this shared `Scheduler` for a slot. Fast successes widen the "
+        "limit a little and each `429` or `5xx` halves it, so concurrency settles at what the "
+        "API allows right now. Waiting requests are admitted longest first, so the slowest "
+        "chunk is never the one that starts last, and a failed chunk is retried on its own "
+        "with jittered backoff instead of failing the whole narration."
+    ),
+    mdx("4. Join the chunks into one file", 3),
     md(
         "Raw PCM carries no sample rate, so you have to supply the correct one when writing the "
         "WAV header, and it is model specific. `tts-xai-v1` returns 24 kHz while `tts-gradium-v1` "
         "returns 48 kHz. Guess wrong and the narration plays at the wrong speed and pitch.\n"
         "\n"
-        "To find the rate for any model, ask for one short clip as `wav` and read the header it "
-        "comes back with."
+        "So `narrate` never hard-codes it. `sample_rate` asks for one short clip as `wav` and "
+        "reads the header, and `check_voice` looks the voice up in `/models`. Both answers are "
+        "kept in `venice-metadata.json`, the catalog revalidated by `ETag` once a day, so a warm "
+        "start makes no metadata requests at all."
     ),
-    mdx("4. Join the chunks into one file", 2),
+    mdx("4. Join the chunks into one file", 5),
+    mdx("4. Join the chunks into one file", 6),
     md(
         "## 5. Prepare text that sounds right\n"
         "\n"
@@ -243,7 +446,25 @@ NARRATION = [
         "The page keeps this in a second file that imports `narrate`. Here everything shares one "
         "namespace, so that import is dropped."
     ),
-    mdx("5. Prepare text that sounds right", drop=("from narrate import narrate",)),
+    mdx("5. Prepare text that sounds right",
+        drop=("from narrate import (TRAFFIC, check_voice, in_order, narrate, request, sample_rate,",
+              "split_into_chunks, synthesize)")),
+    md(
+        "### Long articles\n"
+        "\n"
+        "`write_script` keeps only the first twenty thousand characters, and nothing can be "
+        "synthesized until its one long generation finishes. `write_script_sections` cuts the "
+        "Markdown at its headings, rewrites every section in parallel, and writes a one-sentence "
+        "bridge across each join. It yields the parts in reading order as they become ready."
+    ),
+    mdx("5. Prepare text that sounds right", 1),
+    md(
+        "`narrate_as_written` starts synthesizing as soon as the first part arrives. "
+        "`as_chunks` holds back only the last chunk of each part, which the next part could "
+        "still extend, so the chunks match what `split_into_chunks` would make from the finished "
+        "script and re-narrating `script.txt` later comes straight out of the cache."
+    ),
+    mdx("5. Prepare text that sounds right", 2),
     md(
         "## 6. Put it together\n"
         "\n"
@@ -271,13 +492,37 @@ NARRATION = [
     ),
     md("Now that `script` exists, the two inspection cells from the tutorial can run."),
     mdx("3. Split text at the 4096 character limit", 1),
-    mdx("4. Join the chunks into one file", 1),
+    mdx("4. Join the chunks into one file", 4),
     md("Synthesize the whole article and listen to it."),
     extra(
         "narrate(script, 'article.wav')\n"
         "\n"
         "Audio('article.wav')"
     ),
+    md(
+        "Every chunk is kept in `tts-cache/`, keyed by a hash of the model, voice, speed, format "
+        "and text. Edit the script and narrate it again, and only the chunks whose text changed "
+        "are sent to `/audio/speech`. Here a closing line is added, so only the last chunk is "
+        "synthesized."
+    ),
+    extra(
+        "script += ' Thanks for listening.'\n"
+        "\n"
+        "narrate(script, 'article.wav')\n"
+        "Audio('article.wav')"
+    ),
+    md(
+        "A page over twenty thousand characters takes the sectioned path. Its sections are "
+        "rewritten in parallel and narrated as they arrive, and the script is saved as it goes."
+    ),
+    extra(
+        "long_markdown = scrape('https://docs.venice.ai/guides/features/tee-e2ee-models')\n"
+        "print(f'{len(long_markdown)} characters in {len(sections(long_markdown))} sections')\n"
+        "\n"
+        "narrate_as_written(write_script_sections(long_markdown), 'long.wav',\n"
+        "                   script_path='long-script.txt')\n"
+        "Audio('long.wav')"
+    ),
     md(
         "## Streaming for interactive use\n"
         "\n"
@@ -288,6 +533,26 @@ NARRATION = [
     ),
     mdx("Streaming for interactive use"),
     extra("Audio('streamed.mp3')"),
+    md(
+        "## Progressive narration\n"
+        "\n"
+        "Streaming covers one request, and an article is several. `narrate_live` streams the "
+        "first chunk as `pcm` so audio starts within a second, synthesizes the next few in the "
+        "background while it plays, and yields everything as one ordered stream. `metrics` "
+        "records when each chunk's first audio was available and how long the stream stalled "
+        "waiting for it."
+    ),
+    mdx("Progressive narration"),
+    mdx("Progressive narration", 1),
+    extra("Audio('live.wav')"),
+    md(
+        "## Where the time went\n"
+        "\n"
+        "Every request in this notebook went through `request` or `stream_chunk`, which "
+        "recorded it per endpoint, busiest first. Totals add up across threads, so they can "
+        "exceed the wall clock."
+    ),
+    extra("print(TRAFFIC.summary())"),
     md(
         "## Next steps\n"
         "\n"
@@ -334,7 +599,7 @@ RESEARCH = [
         "Run this cell first. The configuration cell below reads the key as it is imported."
     ),
     extra(
-        "%pip install -q requests\n"
+        "%pip install -q requests numpy\n"
         "\n"
         "import os\n"
         "\n"
@@ -363,15 +628,26 @@ RESEARCH = [
         "matters: voices belong to models, and sending a voice from one family to a model from "
         "another is the most common first mistake with the speech endpoint.\n"
         "\n"
-        "`sources` and `chunks` are the entire state of the notebook."
+        "`sources`, `chunks` and `vectors` are the entire state of the notebook. `vectors` is "
+        "one NumPy matrix with a row per chunk."
     ),
     mdx("Setting Up"),
+    md(
+        "Every request goes through `api`, which reuses pooled connections from one session "
+        "and makes every thread wait out a `429` together instead of retrying into it. "
+        "`SCHEDULER` decides how many speech requests run at once, longest first, widening "
+        "its limit while they come back fast and halving it on a `429` or `5xx`."
+    ),
+    mdx("Setting Up", 1),
+    mdx("Setting Up", 2),
+    mdx("Setting Up", 3),
     md(
         "## Pick the current model\n"
         "\n"
         "Hardcoding a chat model guarantees the project ages. `/models/traits` reports which "
         "model currently holds each role, so this asks for the current default instead of "
-        "naming one."
+        "naming one. The answer is kept in `metadata.json` for a day and then revalidated with "
+        "its `ETag`, so re-running the notebook does not wait on the network for it."
     ),
     mdx("Choosing a Model That Will Not Go Stale"),
     extra("print('Using', CHAT_MODEL)"),
@@ -390,15 +666,46 @@ RESEARCH = [
         "vectors that each mean something."
     ),
     mdx("Chunking and Embedding"),
+    md(
+        "`embed` keeps every vector in `embeddings.db`, keyed by a hash of the model and the "
+        "text, and only sends cache misses to the API. `cache_stats` shows what that saved, "
+        "and the table is trimmed to the `CACHE_LIMIT` most recently used vectors.\n"
+        "\n"
+        "Each vector is scaled to unit length as it is added, so cosine similarity later is a "
+        "plain dot product. A source whose `ref` is already indexed is skipped, which makes "
+        "re-running the notebook cheap."
+    ),
     mdx("Chunking and Embedding", 1),
+    md(
+        "## Keep the index on disk\n"
+        "\n"
+        "Embedding is the slow, paid part of ingestion. `np.save` writes the matrix as one file "
+        "and `mmap_mode='r'` maps it back instead of reading it, so a saved index loads "
+        "instantly at any size."
+    ),
+    mdx("Keeping the Index on Disk"),
+    md(
+        "## Add many sources at once\n"
+        "\n"
+        "`add_sources` reads several sources in a thread pool and embeds their chunks in full "
+        "batches of 64 as the text arrives, so scraping one source overlaps embedding another."
+    ),
+    mdx("Adding Many Sources at Once"),
     md(
         "Now add some sources. These three Venice pages cover overlapping ground, which makes "
-        "the citations in the next section more interesting. Swap in your own URLs."
+        "the citations in the next section more interesting. Swap in your own URLs.\n"
+        "\n"
+        "Run this cell twice and the second run loads everything from `index/` without "
+        "scraping or embedding again."
     ),
     extra(
-        "add_source('Venice Privacy', 'https://docs.venice.ai/overview/privacy')\n"
-        "add_source('TEE and E2EE Models', 'https://docs.venice.ai/guides/features/tee-e2ee-models')\n"
-        "add_source('VVV and DIEM', 'https://docs.venice.ai/overview/vvv-diem')\n"
+        "load_index()\n"
+        "if add_sources([\n"
+        "    ('Venice Privacy', 'https://docs.venice.ai/overview/privacy'),\n"
+        "    ('TEE and E2EE Models', 'https://docs.venice.ai/guides/features/tee-e2ee-models'),\n"
+        "    ('VVV and DIEM', 'https://docs.venice.ai/overview/vvv-diem'),\n"
+        "]):\n"
+        "    save_index()\n"
         "\n"
         "print(f'{len(chunks)} chunks from {len(sources)} sources')"
     ),
@@ -420,6 +727,9 @@ RESEARCH = [
     md(
         "## Ask a question\n"
         "\n"
+        "One matrix-vector product scores the question against every chunk, and "
+        "`argpartition` picks the top k without sorting the rest.\n"
+        "\n"
         "Two instructions do the work of grounding: answer only from the notes, and say so when "
         "the notes fall short. Without the second one a model quietly fills the gap from memory, "
         "which is the failure mode you are designing out.\n"
@@ -428,6 +738,18 @@ RESEARCH = [
         "out tells you which sources actually carried the answer."
     ),
     mdx("Retrieving the Right Passages"),
+    md(
+        "### Past a few hundred thousand chunks\n"
+        "\n"
+        "The exact scan reads every vector for every question. `AnnIndex` clusters them into "
+        "lists stored as int8 shards on disk, memory-maps a shard only when a question reaches "
+        "it, and keeps the chunk text in SQLite. `probes` sets how many lists a question reads: "
+        "more finds the exact top k more often, fewer answers sooner.\n"
+        "\n"
+        "The corpus here is far too small to need it. Run `ann = AnnIndex.build()` once yours "
+        "is large, and `retrieve` uses it from then on."
+    ),
+    mdx("Scaling to a Million Chunks"),
     mdx("Answering with Citations"),
     extra(
         "from IPython.display import Markdown, display\n"
@@ -435,7 +757,8 @@ RESEARCH = [
         "answer, cited = ask('How does Venice keep my prompts private, and what do I give up?')\n"
         "\n"
         "display(Markdown(answer))\n"
-        "print('Sources:', ', '.join(f\"[{s['number']}] {s['title']}\" for s in cited))"
+        "print('Sources:', ', '.join(f\"[{s['number']}] {s['title']}\" for s in cited))\n"
+        "print(f\"embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses\")"
     ),
     md(
         "## Write the overview script\n"
@@ -478,6 +801,26 @@ RESEARCH = [
         "\n"
         "Audio('overview.wav')"
     ),
+    md(
+        "## Speak while the script is written\n"
+        "\n"
+        "Rendering above could not start until the whole script had arrived. Streamed, the "
+        "completion arrives a fragment at a time, and `closed_turns` yields each turn the moment "
+        "its closing brace does. `audio_overview` takes a generator as readily as a list, so "
+        "every turn goes to `speak` while the model is still writing the next, and the total "
+        "comes close to the longer of the two steps rather than their sum."
+    ),
+    mdx("Speaking While the Script Is Written"),
+    mdx("Speaking While the Script Is Written", 1),
+    extra("Audio('overview.wav')"),
+    md(
+        "## Where the time went\n"
+        "\n"
+        "Every request above went through `api()`, which recorded it per endpoint. Totals add "
+        "up across threads, so they can exceed the wall clock; `ttfb` is how long the API took "
+        "to start answering."
+    ),
+    extra("print(TRAFFIC.summary())"),
     md(
         "## Next steps\n"
         "\n"
@@ -538,6 +881,14 @@ WALLET = [
     ),
     md("## Configuration"),
     mdx("Setting Up"),
+    md(
+        "Every call goes through one `requests.Session`, so connections to Venice stay open "
+        "between calls instead of paying a TLS handshake each time, with a pool of eight for "
+        "the parallel run at the end. `TRAFFIC` records each call per endpoint: bytes each way, "
+        "and total time and time to first byte as histograms."
+    ),
+    mdx("Setting Up", 1),
+    mdx("Setting Up", 2),
     md(
         "## The wallet\n"
         "\n"
@@ -555,11 +906,17 @@ WALLET = [
         "so the format is not negotiable.\n"
         "\n"
         "Signatures last five minutes and each nonce is single use, so we sign a fresh header "
-        "per request. Signing is local and costs nothing."
+        "per request."
     ),
     mdx("Signing In Instead of Authenticating"),
-    md("Read the balance back. `canConsume` already accounts for the ten cent floor."),
+    md(
+        "Signing takes several milliseconds, so `HeaderPool` does it ahead of time on a "
+        "background thread. Each request takes one ready header, used once and discarded "
+        "unused as it nears expiry, and the pool refills when it runs low."
+    ),
     mdx("Signing In Instead of Authenticating", 1),
+    md("Read the balance back. `canConsume` already accounts for the ten cent floor."),
+    mdx("Signing In Instead of Authenticating", 2),
     md(
         "## Putting money in\n"
         "\n"
@@ -588,18 +945,36 @@ WALLET = [
     md(
         "## Reading what it spent\n"
         "\n"
-        "The ledger is authoritative, so ask what was charged rather than estimating from "
-        "token counts."
+        "The ledger is authoritative, but paginated a hundred rows at a time. `ledger_since` "
+        "pages back only as far as the newest row already counted, so a check stays one "
+        "request however long the history gets."
     ),
     mdx("Reading What It Spent"),
+    md(
+        "`Spend` charges each call locally from its `usage` and the model's published prices, "
+        "so the budget check never waits on the network, and replaces each estimate with the "
+        "ledger's figure when it reconciles."
+    ),
+    mdx("Reading What It Spent", 1),
     md(
         "## The budgeted run\n"
         "\n"
         "Before each call the agent checks what it has spent and declines work it cannot pay "
-        "for. Unfunded, this stops immediately and tells you the minimum top-up."
+        "for. The ledger is read every `reconcile_every` calls and at the end, not per call. "
+        "Unfunded, this stops immediately and tells you the minimum top-up."
     ),
     mdx("The Budgeted Run"),
     mdx("The Budgeted Run", 1),
+    md(
+        "## Running tasks in parallel\n"
+        "\n"
+        "`run_parallel` holds the most each task could cost against the budget before sending "
+        "it, and swaps the hold for the actual charge when the call returns. A task is only "
+        "admitted if what is spent plus everything held still fits, so parallel calls cannot "
+        "jointly overshoot."
+    ),
+    mdx("Running Tasks in Parallel"),
+    mdx("Running Tasks in Parallel", 1),
     md(
         "## Next steps\n"
         "\n"
@@ -618,18 +993,292 @@ BUILDS = [
     (WALLET_PAGE, "notebooks/wallet-budget-agent.ipynb", WALLET),
 ]
 
+# Mintlify keeps a translated copy of every page under these prefixes.
+LOCALES = ("ar", "de", "es", "fr", "it", "ko", "pt-BR", "zh")
+
+DOCS_LINK = re.compile(rf"\]\({re.escape(DOCS_URL)}/")
+
+
+def targets() -> list[tuple[str, str, list[Cell], str]]:
+    """Every notebook to build, as (page, out, cells, locale).
+
+    The English notebook comes first, then one per translation of its page,
+    written to `notebooks/{locale}/`. Locale is empty for English.
+    """
+    found = []
+    for page, out, cells in BUILDS:
+        found.append((page, out, cells, ""))
+        folder, name = out.rsplit("/", 1)
+        for locale in LOCALES:
+            if (REPO / locale / page).exists():
+                found.append((page, f"{folder}/{locale}/{name}", cells, locale))
+    return found
+
+
+def names(code: list[str]) -> set[str]:
+    """The identifiers a section's code uses, leaving out its comments and strings."""
+    found: set[str] = set()
+    for block in code:
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(block).readline):
+                if token.type == tokenize.NAME:
+                    found.add(token.string)
+        except (tokenize.TokenError, IndentationError):
+            pass
+    return found
+
+
+def anchors(page: str, locale: str) -> dict[str, str]:
+    """Map the English section titles on `page` to their titles in `locale`.
+
+    A title the translation left in English maps to itself. The rest are
+    matched on what the sections hold rather than where they stand, since the
+    headings carry no ids and translating a page can add, drop or reorder
+    sections: each English section takes the unclaimed translated section whose
+    code uses the most nearly the same names, if at least half of them are
+    shared. A section with no such counterpart is left out, so a cell that
+    needs it finds the translation lagging.
+    """
+    english = code_blocks(REPO / page)
+    translated = code_blocks(REPO / locale / page)
+    mapping = {title: title for title in english if title in translated}
+    left = [title for title in english if title not in mapping]
+    unclaimed = [title for title in translated if title not in mapping.values()]
+    shared = []
+    for ours in left:
+        mine = names(english[ours])
+        for theirs in unclaimed:
+            other = names(translated[theirs])
+            overlap = len(mine & other) / max(1, len(mine | other))
+            if overlap >= 0.5:
+                shared.append((overlap, ours, theirs))
+    for _, ours, theirs in sorted(shared, reverse=True):
+        if ours not in mapping and theirs not in mapping.values():
+            mapping[ours] = theirs
+    return mapping
+
+
+def localize(cells: list[Cell], locale: str) -> list[Cell]:
+    """Point the links in markdown cells at the translated docs."""
+    return [
+        Cell(c.kind, DOCS_LINK.sub(f"]({DOCS_URL}/{locale}/", c.body), c.drop)
+        if c.kind == "markdown"
+        else c
+        for c in cells
+    ]
+
+
+def render(page: str, cells: list[Cell], locale: str = "") -> tuple[str, int, int] | None:
+    """Build one notebook, returning its JSON text with its cell and code cell counts.
+
+    Translations are regenerated after the English page merges, so for a while
+    a translated page can lag the spec. That returns None rather than failing,
+    and the previous translated notebook stays until the translation catches up.
+    """
+    source = f"{locale}/{page}" if locale else page
+    sections = anchors(page, locale) if locale else None
+    if locale:
+        cells = localize(cells, locale)
+
+    try:
+        built = notebook(resolve(cells, code_blocks(REPO / source), source, sections))
+    except Mismatch:
+        if not locale:
+            raise
+        return None
+    code = sum(1 for c in built["cells"] if c["cell_type"] == "code")
+    return json.dumps(built, indent=1, ensure_ascii=False) + "\n", len(built["cells"]), code
+
+
+def execute_all(
+    outs: list[str], jobs: int, tape: str = "", upstream: str = "", tapes: Path | None = None
+) -> list[str]:
+    """Run each notebook, returning those that stopped on an error.
+
+    Requests go to the stand-in, unless `tape` is "record", which records each
+    notebook's traffic to `upstream`, the stand-in by default, into a cassette,
+    or "replay", which answers from the cassettes alone. Cassettes live under
+    `tapes`, `notebooks/cassettes/` unless given.
+    """
+    import cassette
+    import mock_api
+    from execute import execute
+
+    server = None if tape == "replay" else mock_api.serve()
+    stand_in = mock_api.base_url(server) if server else ""
+
+    def one(out: str) -> tuple[str, tuple[int, int, str], float, list[str]]:
+        path = (tapes or cassette.CASSETTES) / Path(out).relative_to("notebooks").with_suffix(".json")
+        proxy = recording = None
+        if tape == "record":
+            proxy, recording = cassette.record(path, upstream or stand_in)
+        elif tape == "replay":
+            if not path.exists():
+                missing = f"no cassette at {path.relative_to(REPO)}, run --record"
+                return out, (0, 0, missing), 0.0, []
+            proxy, recording = cassette.replay(path)
+        base_url = mock_api.base_url(proxy) if proxy else stand_in
+
+        started = time.perf_counter()
+        result = execute(REPO / out, EXECUTED / Path(out).relative_to("notebooks"), base_url)
+        seconds = time.perf_counter() - started
+        notes: list[str] = []
+        if proxy and recording:
+            proxy.shutdown()
+            if tape == "record":
+                recording.save()
+                notes.append(f"recorded {recording.summary()}")
+            else:
+                notes.extend(cassette.report(recording) or [f"replayed {recording.summary()}"])
+                if recording.misses:
+                    result = (*result[:2], result[2] or "requests not in the cassette")
+        return out, result, seconds, notes
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for out, (ran, total, error), seconds, notes in pool.map(one, outs):
+            print(f"executed {out}: {ran}/{total} code cells in {seconds:.1f}s")
+            for note in notes:
+                print(f"  {note}")
+            if error:
+                failed.append(out)
+                print(f"  stopped at: {error}")
+    if server:
+        server.shutdown()
+    return failed
+
+
+def check_payloads() -> int:
+    """Validate the request bodies in every English page's snippets against swagger.yaml."""
+    import payloads
+    from snippets import english_pages
+
+    try:
+        checked, problems = payloads.check(english_pages())
+    except ModuleNotFoundError as error:
+        if error.name != "yaml":
+            raise
+        # Only a fresh clone or a changed spec gets here: the parsed spec is cached.
+        print("skipped checking request bodies: parsing swagger.yaml needs PyYAML "
+              "(pip install pyyaml)")
+        return 0
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        print(f"{len(problems)} request bodies disagree with swagger.yaml", file=sys.stderr)
+        return 1
+    print(f"{checked} request bodies match swagger.yaml")
+    return 0
+
+
+def check_round_trip(outs: list[str], jobs: int) -> int:
+    """Record each notebook against the stand-in, then replay it from what was recorded.
+
+    A notebook replays only if every run sends the same requests, so this fails
+    on one whose traffic depends on timing, such as work numbered in the order
+    threads finish, and on one that does not run at all. Passes are remembered under `notebooks/.cache/`, keyed by the
+    notebook and the tools that run it, so an unchanged notebook is not run again.
+    """
+    import tempfile
+
+    passed_path = REPO / "notebooks" / ".cache" / "round-trip.json"
+    tools = b"".join((REPO / "notebooks" / name).read_bytes()
+                     for name in ("cassette.py", "execute.py", "mock_api.py"))
+    keys = {out: digest((REPO / out).read_bytes() + tools) for out in outs}
+    passed = json.loads(passed_path.read_text(encoding="utf-8")) if passed_path.exists() else {}
+    todo = [out for out in outs if passed.get(out) != keys[out]]
+
+    unrecorded: list[str] = []
+    diverged: list[str] = []
+    if todo:
+        try:
+            with tempfile.TemporaryDirectory() as tapes:
+                unrecorded = execute_all(todo, jobs, "record", tapes=Path(tapes))
+                recorded = [out for out in todo if out not in unrecorded]
+                diverged = execute_all(recorded, jobs, "replay", tapes=Path(tapes))
+        except ModuleNotFoundError as error:
+            if error.name != "yaml":
+                raise
+            print("skipped the record and replay round trip: the stand-in needs PyYAML "
+                  "(pip install pyyaml)")
+            return 0
+        for out in recorded:
+            if out not in diverged:
+                passed[out] = keys[out]
+        passed_path.parent.mkdir(parents=True, exist_ok=True)
+        passed_path.write_text(json.dumps(passed, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+    if unrecorded:
+        print("did not run against the stand-in, so there was nothing to replay:",
+              ", ".join(unrecorded), file=sys.stderr)
+    if diverged:
+        print("replay differs from what was recorded, so a request depends on timing:",
+              ", ".join(diverged), file=sys.stderr)
+    if unrecorded or diverged:
+        return 1
+    print(f"{sum(passed.get(out) == keys[out] for out in outs)} notebooks replay what they recorded")
+    return 0
+
 
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--check", action="store_true", help="fail if a notebook is out of date")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the manifest matches")
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1, help="processes to build notebooks in"
+    )
+    parser.add_argument(
+        "--execute", action="store_true", help="run every notebook against the local stand-in"
+    )
+    tape = parser.add_mutually_exclusive_group()
+    tape.add_argument(
+        "--record", action="store_true", help="execute, recording each notebook's API traffic"
+    )
+    tape.add_argument(
+        "--replay", action="store_true", help="execute against the recordings, without a network"
+    )
+    tape.add_argument(
+        "--round-trip", action="store_true",
+        help="record each English notebook against the stand-in, then replay it",
+    )
+    parser.add_argument(
+        "--upstream", default="", help="API to record from, such as the live one, else the stand-in"
+    )
     args = parser.parse_args()
 
-    stale = []
-    for page, out, cells in BUILDS:
-        built = notebook(resolve(cells, code_blocks(REPO / page), page))
-        text = json.dumps(built, indent=1, ensure_ascii=False) + "\n"
+    manifest = load_manifest()
+    updated = dict(manifest)
+    pending, lagging = [], []
+    for page, out, cells, locale in targets():
+        pages = [page, f"{locale}/{page}"] if locale else [page]
+        inputs = fingerprint(pages, cells)
+        if not args.force and (manifest.get(out) or {}).get("lagging") == inputs:
+            # Already found not to match these exact pages; nothing to render.
+            lagging.append(out)
+        elif args.force or not fresh(manifest.get(out), inputs, REPO / out):
+            pending.append((page, out, cells, locale, inputs))
+
+    jobs = [(page, cells, locale) for page, _, cells, locale, _ in pending]
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as pool:
+            results = list(pool.map(render, *zip(*jobs)))
+    else:
+        results = [render(*job) for job in jobs]
+
+    stale, unrecorded = [], []
+    for (page, out, _, locale, inputs), result in zip(pending, results):
         target = REPO / out
+        if result is None:
+            print(f"skipped {out}: {locale}/{page} does not match the English page yet")
+            lagging.append(out)
+            if args.check:
+                unrecorded.append(out)
+            else:
+                # Remember the skip, so these pages are not rendered again until one changes.
+                updated[out] = (manifest.get(out) or {}) | {"lagging": inputs}
+            continue
 
+        text, count, code = result
         if args.check:
             current = target.read_text(encoding="utf-8") if target.exists() else ""
             if current != text:
@@ -638,14 +1287,35 @@ def main() -> int:
 
         target.parent.mkdir(parents=True, exist_ok=True)
         target.write_text(text, encoding="utf-8")
-        code = sum(1 for k, _ in resolve(cells, code_blocks(REPO / page), page) if k == "code")
-        print(f"wrote {out} ({len(built['cells'])} cells, {code} code) from {page}")
+        updated[out] = inputs | {"notebook": digest(text.encode("utf-8"))}
+        source = f"{locale}/{page}" if locale else page
+        print(f"wrote {out} ({count} cells, {code} code) from {source}")
 
-    if stale:
-        print("out of date, run python notebooks/build.py:", ", ".join(stale), file=sys.stderr)
+    if not args.check and updated != manifest:
+        MANIFEST.write_text(json.dumps(updated, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+    if lagging:
+        print(f"{len(lagging)} translated notebooks wait for their page's translation to catch up")
+    if stale or unrecorded:
+        if stale:
+            print("out of date, run python notebooks/build.py:", ", ".join(stale), file=sys.stderr)
+        if unrecorded:
+            print("newly lagging, not yet in manifest.json, run python notebooks/build.py:",
+                  ", ".join(unrecorded), file=sys.stderr)
         return 1
     if args.check:
         print("notebooks are up to date")
+        if check_payloads():
+            return 1
+    if args.round_trip:
+        english = [out for _, out, _, locale in targets() if not locale]
+        if check_round_trip(english, args.jobs):
+            return 1
+    tape = "record" if args.record else "replay" if args.replay else ""
+    # A translation that has lagged since before its first build has no notebook to run.
+    outs = [out for _, out, _, _ in targets() if (REPO / out).exists()]
+    if (args.execute or tape) and execute_all(outs, args.jobs, tape, args.upstream):
+        return 1
     return 0
 
 
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Record a notebook's API traffic once, then replay it without the network.
+
+A full run of a notebook against the live API scrapes, embeds, chats and
+synthesizes minutes of speech, which is slow and costs credit every time. This
+sits where `mock_api.py` does, in front of `execute.py`, as a local server.
+Recording forwards each request to an upstream, the live API or the stand-in,
+and keeps the response. Replaying answers from the recording alone.
+
+A cassette is a JSON list of interactions: the request's method, path and a
+hash of its body, and the response's status, a few headers and a hash of its
+body. Bodies live apart from the cassettes under `bodies/`, named by their
+SHA-256, so the same audio recorded by several notebooks, or by every locale of
+one, is stored once. JSON request bodies are hashed with their keys sorted,
+multipart bodies without their random boundary, and wallet addresses, which the
+wallet notebook generates afresh on every run, are replaced by a placeholder, so
+a request matches however its client happened to serialize it.
+
+Replay matches requests by method, path and body hash. Identical requests are
+answered in the order they were recorded, which keeps a GET that was first
+answered 200 and then 304 behaving the same way. A request the cassette does
+not hold, or holds fewer times than it is made, gets a 404 naming it and is
+reported when the run ends, so a notebook whose traffic changed fails rather
+than passing against stale answers.
+
+Usage: python notebooks/cassette.py CASSETTE [--record UPSTREAM] [--port 8788]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import http.client
+import json
+import re
+import sys
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from mock_api import PREFIX, base_url
+
+CASSETTES = Path(__file__).resolve().parent / "cassettes"
+BODIES = CASSETTES / "bodies"
+
+# Response headers worth replaying. The rest describe the recording connection.
+KEPT = ("Content-Type", "ETag", "Retry-After")
+BOUNDARY = re.compile(r"boundary=\"?([^\";]+)")
+# A wallet the notebook generates afresh on every run.
+WALLET = re.compile(rb"0x[0-9a-fA-F]{40}(?![0-9a-fA-F])")
+
+
+def request_key(method: str, path: str, content_type: str, body: bytes) -> str:
+    """What identifies a request on replay: method, path and a canonical body hash."""
+    if body and "json" in content_type:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+        except ValueError:
+            pass
+    boundary = BOUNDARY.search(content_type)
+    if body and boundary:
+        body = body.replace(boundary.group(1).encode(), b"BOUNDARY")
+    body = WALLET.sub(b"{wallet}", body)
+    path = WALLET.sub(b"{wallet}", path.encode()).decode()
+    digest = hashlib.sha256(body).hexdigest()[:16] if body else "-"
+    return f"{method} {path} {digest}"
+
+
+def store(body: bytes) -> str:
+    """Keep `body` under its hash, once, and return the hash."""
+    name = hashlib.sha256(body).hexdigest()
+    target = BODIES / name[:2] / name
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f"{name}.{threading.get_ident()}.tmp")
+        partial.write_bytes(body)
+        partial.replace(target)
+    return name
+
+
+def fetch(name: str) -> bytes:
+    return (BODIES / name[:2] / name).read_bytes()
+
+
+class Cassette:
+    """The interactions of one run, in the order their responses finished."""
+
+    def __init__(self, path: Path, interactions: list[dict] | None = None):
+        self.path = path
+        self.interactions = interactions or []
+        self.lock = threading.Lock()
+        self.pending: dict[str, deque[dict]] = defaultdict(deque)
+        for interaction in self.interactions:
+            self.pending[interaction["key"]].append(interaction)
+        self.misses: list[str] = []
+
+    @classmethod
+    def load(cls, path: Path) -> Cassette:
+        return cls(path, json.loads(path.read_text(encoding="utf-8"))["interactions"])
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ",\n".join(json.dumps(i, separators=(",", ":")) for i in self.interactions)
+        self.path.write_text(f'{{"interactions": [\n{lines}\n]}}\n', encoding="utf-8")
+
+    def add(
+        self, key: str, status: int, headers: dict[str, str], body: bytes, streamed: bool
+    ) -> None:
+        interaction = {
+            "key": key, "status": status, "headers": headers,
+            "body": store(body), "size": len(body), "streamed": streamed,
+        }
+        with self.lock:
+            self.interactions.append(interaction)
+
+    def take(self, key: str) -> dict | None:
+        """The next recorded answer to `key`, or None after noting the miss."""
+        with self.lock:
+            if self.pending[key]:
+                return self.pending[key].popleft()
+            self.misses.append(key)
+            return None
+
+    def unused(self) -> list[str]:
+        return [i["key"] for queue in self.pending.values() for i in queue]
+
+    def summary(self) -> str:
+        stored = sum(i["size"] for i in self.interactions)
+        return f"{len(self.interactions)} interactions, {stored / 1e6:.1f} MB of bodies"
+
+
+class Handler(BaseHTTPRequestHandler):
+    cassette: Cassette
+    upstream: str | None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def handle_any(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = self.path[len(PREFIX):] if self.path.startswith(PREFIX) else self.path
+        key = request_key(self.command, path, self.headers.get("Content-Type", ""), body)
+        if self.upstream:
+            self.record(key, path, body)
+        else:
+            self.replay(key)
+
+    def replay(self, key: str) -> None:
+        interaction = self.cassette.take(key)
+        if interaction is None:
+            error = json.dumps({"error": f"{key} is not in the cassette"}).encode()
+            self.send_response(404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(error)))
+            self.end_headers()
+            self.wfile.write(error)
+            return
+
+        body = fetch(interaction["body"])
+        self.send_response(interaction["status"])
+        for name, value in interaction["headers"].items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def record(self, key: str, path: str, body: bytes) -> None:
+        """Forward the request upstream, passing the response through as it arrives."""
+        target = urlsplit(self.upstream)
+        connection_type = (http.client.HTTPSConnection if target.scheme == "https"
+                           else http.client.HTTPConnection)
+        connection = connection_type(target.netloc, timeout=600)
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in ("host", "connection", "accept-encoding")}
+        connection.request(self.command, target.path + path, body=body or None, headers=headers)
+        response = connection.getresponse()
+
+        kept = {name: response.headers[name] for name in KEPT if name in response.headers}
+        streamed = response.getheader("Content-Length") is None
+        self.send_response(response.status)
+        for name, value in kept.items():
+            self.send_header(name, value)
+        pieces = []
+        if streamed:
+            # The body ends when the connection closes, as the stand-in streams it.
+            self.end_headers()
+            while piece := response.read1(65536):
+                pieces.append(piece)
+                self.wfile.write(piece)
+                self.wfile.flush()
+        else:
+            payload = response.read()
+            pieces.append(payload)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        connection.close()
+        self.cassette.add(key, response.status, kept, b"".join(pieces), streamed)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_any
+
+
+def serve(cassette: Cassette, upstream: str | None = None, port: int = 0) -> ThreadingHTTPServer:
+    """Record through to `upstream`, or replay `cassette` when there is none."""
+    handler = type("CassetteHandler", (Handler,), {"cassette": cassette, "upstream": upstream})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record(path: Path, upstream: str, port: int = 0) -> tuple[ThreadingHTTPServer, Cassette]:
+    cassette = Cassette(path)
+    return serve(cassette, upstream, port), cassette
+
+
+def replay(path: Path, port: int = 0) -> tuple[ThreadingHTTPServer, Cassette]:
+    cassette = Cassette.load(path)
+    return serve(cassette, None, port), cassette
+
+
+def report(cassette: Cassette) -> list[str]:
+    """What a replay did not find in the cassette, and what it never asked for."""
+    lines = [f"not in the cassette: {key}" for key in cassette.misses]
+    unused = cassette.unused()
+    if unused:
+        lines.append(f"{len(unused)} recorded interactions were never requested")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--record", metavar="UPSTREAM", help="API to record from, else replay")
+    parser.add_argument("--port", type=int, default=8788)
+    args = parser.parse_args()
+
+    if args.record:
+        server, cassette = record(args.cassette, args.record, args.port)
+    else:
+        server, cassette = replay(args.cassette, args.port)
+    mode = f"recording {args.record}" if args.record else f"replaying {args.cassette}"
+    print(f"serving {base_url(server)}, {mode}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    if args.record:
+        cassette.save()
+        print(f"wrote {args.cassette}: {cassette.summary()}", file=sys.stderr)
+    for line in report(cassette):
+        print(line, file=sys.stderr)
+    return 1 if cassette.misses else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
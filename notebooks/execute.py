@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Run a built notebook top to bottom and record what each cell printed.
+
+This is the part of Jupyter `build.py --execute` needs and nothing more. Each
+notebook runs in a fresh interpreter inside a scratch directory, its code cells
+sharing one namespace. Colab magics such as `%pip install` are skipped, since
+the packages have to be installed already, and requests meant for the live
+API are pointed at the base URL given instead, normally `mock_api.py`.
+
+A cell's stdout and stderr become stream outputs and its final expression an
+`execute_result`, the way Jupyter records them. The first cell to raise gets
+an error output and stops the run, leaving the cells after it unexecuted.
+
+Usage: python notebooks/execute.py NOTEBOOK OUT --base-url URL
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+from mock_api import LIVE_URL
+
+
+def code_of(cell: dict, base_url: str) -> str:
+    lines = "".join(cell["source"]).splitlines()
+    kept = [line for line in lines if not line.lstrip().startswith(("%", "!"))]
+    return "\n".join(kept).replace(LIVE_URL, base_url)
+
+
+def stream(name: str, text: str) -> dict:
+    return {"output_type": "stream", "name": name, "text": text.splitlines(keepends=True)}
+
+
+def expire(signum, frame):
+    raise TimeoutError("cell timed out")
+
+
+def run_cells(notebook: dict, base_url: str, timeout: int) -> dict:
+    """Execute `notebook` in this process, filling in outputs as it goes."""
+    namespace: dict = {"__name__": "__main__"}
+    count = 0
+    signal.signal(signal.SIGALRM, expire)
+
+    for cell in notebook["cells"]:
+        if cell["cell_type"] != "code":
+            continue
+        count += 1
+        cell["execution_count"] = count
+        outputs: list[dict] = []
+        stdout, stderr = io.StringIO(), io.StringIO()
+        started = time.perf_counter()
+        failed = None
+        try:
+            tree = ast.parse(code_of(cell, base_url))
+            last = tree.body.pop() if tree.body and isinstance(tree.body[-1], ast.Expr) else None
+            signal.alarm(timeout)
+            try:
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    exec(compile(tree, f"<cell {count}>", "exec"), namespace)
+                    value = eval(compile(ast.Expression(last.value), f"<cell {count}>", "eval"),
+                                 namespace) if last else None
+            finally:
+                signal.alarm(0)
+        except BaseException as error:
+            failed = error
+            value = None
+
+        for name, buffer in (("stdout", stdout), ("stderr", stderr)):
+            if buffer.getvalue():
+                outputs.append(stream(name, buffer.getvalue()))
+        if value is not None:
+            outputs.append({
+                "output_type": "execute_result",
+                "execution_count": count,
+                "data": {"text/plain": repr(value).splitlines(keepends=True)},
+                "metadata": {},
+            })
+        if failed is not None:
+            outputs.append({
+                "output_type": "error",
+                "ename": type(failed).__name__,
+                "evalue": str(failed),
+                "traceback": traceback.format_exception(failed),
+            })
+        cell["outputs"] = outputs
+        cell["metadata"]["execution_seconds"] = round(time.perf_counter() - started, 3)
+        if failed is not None:
+            break
+    return notebook
+
+
+def execute(notebook: Path, out: Path, base_url: str, timeout: int = 300) -> tuple[int, int, str]:
+    """Run `notebook` in a fresh interpreter and write the executed copy to `out`.
+
+    Returns how many code cells ran, how many there are, and the first error.
+    """
+    env = os.environ | {"VENICE_API_KEY": os.environ.get("VENICE_API_KEY", "notebook-test-key")}
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="notebook-") as scratch:
+        worker = subprocess.run(
+            [sys.executable, __file__, str(notebook.resolve()), str(out.resolve()),
+             "--base-url", base_url, "--timeout", str(timeout)],
+            cwd=scratch, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+        )
+    if worker.returncode or not out.exists():
+        return 0, 0, worker.stderr.strip().splitlines()[-1] if worker.stderr.strip() else "worker failed"
+
+    code = [c for c in json.loads(out.read_text(encoding="utf-8"))["cells"] if c["cell_type"] == "code"]
+    ran = [c for c in code if c["execution_count"] is not None]
+    errors = [o for c in ran for o in c["outputs"] if o["output_type"] == "error"]
+    error = f"{errors[0]['ename']}: {errors[0]['evalue']}" if errors else ""
+    return len(ran), len(code), error
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("notebook", type=Path)
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--base-url", default=LIVE_URL)
+    parser.add_argument("--timeout", type=int, default=300, help="seconds allowed per cell")
+    args = parser.parse_args()
+
+    notebook = json.loads(args.notebook.read_text(encoding="utf-8"))
+    executed = run_cells(notebook, args.base_url, args.timeout)
+    args.out.write_text(json.dumps(executed, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""A local stand-in for the Venice API, answering from swagger.yaml.
+
+Tutorial code can only run against the live API, which needs a key, a network
+and credit. This serves `/api/v1` on localhost instead. Every operation in the
+spec answers with its success response: the example when the spec gives one,
+otherwise a value built from the response schema, so the shape is what the
+real endpoint returns even though the content is placeholder.
+
+A few endpoints answer with content the tutorials can actually use. Speech
+returns deterministic audio whose length follows the input, as PCM or WAV at a
+configurable sample rate, and can stream it. Embeddings are fixed-dimension
+unit vectors derived from each input's hash, so equal text embeds equally.
+Chat answers a `json_schema` request with JSON matching the schema, and
+streams when asked to. Scraping and parsing return paragraphs of filler text.
+`/models` and `/models/traits` serve the catalog snapshot in `data/`, with any
+`model_spec` fields the snapshot omits filled in from the schema. Whole GET
+responses carry an `ETag` and answer a matching `If-None-Match` with a 304, so
+client-side caches can be exercised.
+
+Latency is injected per request, plus a real-time factor for speech, so the
+tutorials' thread pools can be timed against something that behaves like a
+slow backend. Nothing else is checked about a request: the point is to
+exercise the code that consumes responses, not to reimplement the API.
+
+Usage: python notebooks/mock_api.py [--port 8787] [--latency 0.2]
+           [--latency /audio/speech=1.5] [--speech-rtf 0.15] [--sample-rate 24000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+import wave
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+
+import openapi
+
+REPO = Path(__file__).resolve().parent.parent
+SPEC = REPO / "swagger.yaml"
+MODELS = REPO / "data" / "static-models.json"
+TRAITS = REPO / "data" / "static-traits.json"
+PREFIX = "/api/v1"
+LIVE_URL = "https://api.venice.ai/api/v1"
+
+WORDS = (
+    "venice private inference model request response token prompt stream voice audio "
+    "embedding vector source chunk answer citation wallet balance ledger charge budget "
+    "privacy proxy enclave provider latency batch retry schema overview host script"
+).split()
+
+
+def load_spec(path: Path = SPEC) -> dict:
+    return openapi.document(path)
+
+
+def encode(value: Any) -> bytes:
+    return json.dumps(value).encode("utf-8")
+
+
+class Spec(openapi.Index):
+    """Routes and response samples for every operation in an OpenAPI document."""
+
+    def success(self, operation: dict) -> tuple[int, dict]:
+        """The lowest 2xx status an operation declares, with its response object."""
+        codes = sorted(str(code) for code in operation.get("responses", {}) if str(code)[0] == "2")
+        if not codes:
+            return 200, {}
+        return int(codes[0]), self.deref(operation["responses"][codes[0]])
+
+    def sample(self, schema: Any, depth: int = 0) -> Any:
+        """A value that satisfies `schema`, preferring whatever example it carries."""
+        schema = self.deref(schema) or {}
+        if "example" in schema:
+            return schema["example"]
+        if "default" in schema:
+            return schema["default"]
+        if schema.get("enum"):
+            return schema["enum"][0]
+        for key in ("oneOf", "anyOf"):
+            if schema.get(key):
+                return self.sample(schema[key][0], depth)
+        if "allOf" in schema:
+            merged: dict[str, Any] = {}
+            for part in schema["allOf"]:
+                value = self.sample(part, depth)
+                if isinstance(value, dict):
+                    merged |= value
+            return merged
+
+        kind = schema.get("type")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), None)
+        if kind == "object" or (kind is None and "properties" in schema):
+            if depth > 8:
+                return {}
+            return {
+                name: self.sample(prop, depth + 1)
+                for name, prop in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            return [] if depth > 8 else [self.sample(schema.get("items", {}), depth + 1)]
+        if kind == "string":
+            if schema.get("format") == "date-time":
+                return "2026-01-01T00:00:00.000Z"
+            return "string"
+        if kind == "integer":
+            return int(schema.get("minimum", 0))
+        if kind == "number":
+            return float(schema.get("minimum", 0))
+        if kind == "boolean":
+            return True
+        return None
+
+    def respond(self, operation: dict) -> Reply:
+        """The success response an operation declares, filled in from the spec."""
+        status, response = self.success(operation)
+        content = response.get("content", {})
+        if not content:
+            return Reply(status, "application/json", b"{}")
+
+        kind = "application/json" if "application/json" in content else next(iter(content))
+        media = content[kind]
+        if kind != "application/json":
+            return Reply(status, kind, b"\x00" * 1024)
+
+        if "example" in media:
+            body = media["example"]
+        elif media.get("examples"):
+            body = self.deref(next(iter(media["examples"].values()))).get("value")
+        else:
+            body = self.sample(media.get("schema", {}))
+        return Reply(status, kind, encode(body))
+
+
+class Options:
+    """How the stand-in behaves beyond what the spec says."""
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        dimensions: int = 1024,
+        latency: dict[str, float] | None = None,
+        speech_rtf: float = 0.0,
+        chars_per_second: float = 15.0,
+        scrape_chars: int = 8000,
+    ):
+        self.sample_rate, self.dimensions = sample_rate, dimensions
+        # Seconds before the first byte, by path template, with "*" as the default.
+        self.latency = latency or {}
+        # Seconds spent synthesizing each second of speech, on top of latency.
+        self.speech_rtf = speech_rtf
+        self.chars_per_second = chars_per_second
+        self.scrape_chars = scrape_chars
+
+    def delay(self, template: str) -> float:
+        return self.latency.get(template, self.latency.get("*", 0.0))
+
+
+def seeded(text: str) -> random.Random:
+    return random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+
+
+@functools.lru_cache(maxsize=None)
+def tone(pitch: int, rate: int) -> bytes:
+    """One second of a sine at a whole number of hertz, so it repeats seamlessly."""
+    samples = array("h", (int(3000 * math.sin(2 * math.pi * pitch * n / rate)) for n in range(rate)))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def pcm(text: str, rate: int, speed: float = 1.0, chars_per_second: float = 15.0) -> bytes:
+    """Mono signed 16-bit little-endian samples, as long as `text` would take to say."""
+    seconds = max(0.2, len(text) / chars_per_second / (speed or 1.0))
+    second = tone(110 + seeded(text).randrange(110), rate)
+    size = int(seconds * rate) * 2
+    return (second * (size // len(second) + 1))[:size]
+
+
+def wav(frames: bytes, rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(frames)
+    return buffer.getvalue()
+
+
+def embedding(text: str, dimensions: int) -> list[float]:
+    rng = seeded(text)
+    vector = [rng.gauss(0, 1) for _ in range(dimensions)]
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [round(x / norm, 7) for x in vector]
+
+
+def filler(seed: str, chars: int) -> str:
+    """Markdown-ish paragraphs of about `chars` characters."""
+    rng, paragraphs, size = seeded(seed), [], 0
+    while size < chars:
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+            for _ in range(rng.randint(2, 6))
+        ]
+        paragraphs.append(" ".join(sentences))
+        size += len(paragraphs[-1]) + 2
+    return "\n\n".join(paragraphs)
+
+
+class Reply:
+    """A response, either whole or as pieces written with pauses between them."""
+
+    def __init__(self, status: int, kind: str, body: bytes = b"", pieces=None, pause: float = 0.0):
+        self.status, self.kind, self.body = status, kind, body
+        self.pieces, self.pause = pieces, pause
+
+
+def speech(spec: Spec, options: Options, request: dict) -> Reply:
+    text = str(request.get("input", ""))
+    fmt = request.get("response_format") or "mp3"
+    frames = pcm(text, options.sample_rate, float(request.get("speed") or 1.0), options.chars_per_second)
+    body = wav(frames, options.sample_rate) if fmt == "wav" else frames
+    kind = {"pcm": "audio/pcm", "wav": "audio/wav", "mp3": "audio/mpeg"}.get(fmt, f"audio/{fmt}")
+    synthesis = len(frames) / 2 / options.sample_rate * options.speech_rtf
+    if request.get("streaming"):
+        step = 4096
+        pieces = [body[i:i + step] for i in range(0, len(body), step)]
+        return Reply(200, kind, pieces=pieces, pause=synthesis / max(1, len(pieces)))
+    time.sleep(synthesis)
+    return Reply(200, kind, body)
+
+
+def embeddings(spec: Spec, options: Options, request: dict) -> Reply:
+    inputs = request.get("input", "")
+    inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+    tokens = sum(len(str(text).split()) for text in inputs)
+    body = {
+        "object": "list",
+        "model": request.get("model", "text-embedding-bge-m3"),
+        "data": [
+            {"object": "embedding", "index": index, "embedding": embedding(str(text), options.dimensions)}
+            for index, text in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+    return Reply(200, "application/json", encode(body))
+
+
+def chat(spec: Spec, options: Options, request: dict) -> Reply:
+    body = spec.respond(spec.find("POST", "/chat/completions").definition)
+    completion = json.loads(body.body)
+    fmt = request.get("response_format") or {}
+    if fmt.get("type") == "json_schema":
+        content = json.dumps(spec.sample(fmt["json_schema"].get("schema", {})))
+        completion["choices"][0]["message"]["content"] = content
+    content = completion["choices"][0]["message"]["content"]
+    if not request.get("stream"):
+        return Reply(200, "application/json", encode(completion))
+
+    step = 16
+    pieces = [
+        b"data: " + encode({
+            "id": completion.get("id"),
+            "object": "chat.completion.chunk",
+            "model": completion.get("model"),
+            "choices": [{"index": 0, "delta": {"content": content[i:i + step]}, "finish_reason": None}],
+        }) + b"\n\n"
+        for i in range(0, len(content), step)
+    ]
+    pieces.append(b"data: [DONE]\n\n")
+    return Reply(200, "text/event-stream", pieces=pieces)
+
+
+def scrape(spec: Spec, options: Options, request: dict) -> Reply:
+    url = str(request.get("url", ""))
+    body = {"url": url, "content": filler(url, options.scrape_chars), "format": "markdown"}
+    return Reply(200, "application/json", encode(body))
+
+
+def text_parser(spec: Spec, options: Options, request: dict) -> Reply:
+    text = filler("text-parser", options.scrape_chars)
+    return Reply(200, "application/json", encode({"text": text, "tokens": len(text.split())}))
+
+
+def models(spec: Spec, options: Options, request: dict) -> Reply:
+    _, response = spec.success(spec.find("GET", "/models").definition)
+    listing = spec.deref(response["content"]["application/json"]["schema"])
+    model_spec = spec.deref(spec.deref(listing["properties"]["data"]["items"])["properties"]["model_spec"])
+
+    kind = request.get("type", "text")
+    data = []
+    for model in json.loads(MODELS.read_text(encoding="utf-8")):
+        if kind != "all" and model.get("type") != kind:
+            continue
+        filled = {
+            name: spec.sample(prop)
+            for name, prop in model_spec.get("properties", {}).items()
+            if name not in model["model_spec"]
+        }
+        data.append(model | {"object": "model", "model_spec": filled | model["model_spec"]})
+    return Reply(200, "application/json", encode({"object": "list", "type": kind, "data": data}))
+
+
+def traits(spec: Spec, options: Options, request: dict) -> Reply:
+    body = {"object": "list", "type": request.get("type", "text"),
+            "data": json.loads(TRAITS.read_text(encoding="utf-8"))}
+    return Reply(200, "application/json", encode(body))
+
+
+BEHAVIOURS = {
+    "/models": models,
+    "/models/traits": traits,
+    "/audio/speech": speech,
+    "/embeddings": embeddings,
+    "/chat/completions": chat,
+    "/augment/scrape": scrape,
+    "/augment/text-parser": text_parser,
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    spec: Spec
+    options: Options
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def handle_any(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            request = json.loads(raw) if raw[:1] in (b"{", b"[") else {}
+        except ValueError:
+            request = {}
+
+        path, _, query = self.path.partition("?")
+        if isinstance(request, dict):
+            request = {name: values[0] for name, values in parse_qs(query).items()} | request
+        found = self.spec.find(self.command, path[len(PREFIX):]) if path.startswith(PREFIX) else None
+        if found is None:
+            error = {"error": f"{self.command} {path} is not in swagger.yaml"}
+            reply = Reply(404, "application/json", encode(error))
+        else:
+            time.sleep(self.options.delay(found.template))
+            behaviour = BEHAVIOURS.get(found.template)
+            if behaviour and isinstance(request, dict):
+                reply = behaviour(self.spec, self.options, request)
+            else:
+                reply = self.spec.respond(found.definition)
+
+        etag = None
+        if self.command == "GET" and reply.status == 200 and reply.pieces is None:
+            etag = '"' + hashlib.sha256(reply.body).hexdigest()[:32] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                reply = Reply(304, reply.kind)
+
+        self.send_response(reply.status)
+        self.send_header("Content-Type", reply.kind)
+        if etag:
+            self.send_header("ETag", etag)
+        if reply.pieces is None:
+            self.send_header("Content-Length", str(len(reply.body)))
+            self.end_headers()
+            self.wfile.write(reply.body)
+            return
+
+        # HTTP/1.0 without a length: the body ends when the connection closes.
+        self.end_headers()
+        for piece in reply.pieces:
+            self.wfile.write(piece)
+            self.wfile.flush()
+            time.sleep(reply.pause)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_any
+
+
+def serve(port: int = 0, spec: Spec | None = None, options: Options | None = None) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread. Port 0 picks a free one."""
+    handler = type(
+        "SpecHandler",
+        (Handler,),
+        {"spec": spec or Spec(load_spec()), "options": options or Options()},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_latency(values: list[str]) -> dict[str, float]:
+    """`0.2` sets the default, `/audio/speech=1.5` sets one path template."""
+    latency = {}
+    for value in values:
+        template, _, seconds = value.rpartition("=")
+        latency[template or "*"] = float(seconds)
+    return latency
+
+
+def add_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sample-rate", type=int, default=24000, help="rate of generated speech")
+    parser.add_argument("--dimensions", type=int, default=1024, help="length of each embedding")
+    parser.add_argument(
+        "--latency", action="append", default=[], metavar="[PATH=]SECONDS",
+        help="delay before each response, for every path or for one; repeatable",
+    )
+    parser.add_argument(
+        "--speech-rtf", type=float, default=0.0,
+        help="extra seconds of synthesis per second of speech, 0.15 is close to tts-xai-v1",
+    )
+
+
+def options_from(args: argparse.Namespace) -> Options:
+    return Options(
+        sample_rate=args.sample_rate,
+        dimensions=args.dimensions,
+        latency=parse_latency(args.latency),
+        speech_rtf=args.speech_rtf,
+    )
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    """The URL to use in place of `LIVE_URL` for a running stand-in."""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{PREFIX}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8787)
+    add_options(parser)
+    args = parser.parse_args()
+
+    server = serve(args.port, options=options_from(args))
+    print(f"serving {base_url(server)} from {SPEC.name}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""swagger.yaml, parsed once and indexed by path and method.
+
+The spec is over half a megabyte of YAML, which takes a third of a second to
+parse with libyaml and several times that without it. The parsed document is
+therefore cached as JSON under `notebooks/.cache/`, keyed by a hash of the
+spec and of this file, and every later load reads the JSON instead. Editing
+either one makes the old cache miss, and the next load writes a new one.
+
+On top of the document, `Index` matches a concrete request path to the
+operation serving it and compiles each operation's JSON request body schema
+into a validator once, `$ref`s resolved and shared between operations. Only
+the keywords the spec uses are checked: types, `nullable`, `enum`, `const`,
+properties, `required`, `additionalProperties`, items, the `anyOf`, `oneOf`
+and `allOf` combinators, and the numeric, length and pattern bounds. `format`
+is not checked.
+
+Values can be left partly unknown, for callers that validate code rather than
+requests: `UNKNOWN` satisfies any schema, and an `Open` dict, one that may hold
+keys nobody can see yet, is excused from `required` and `additionalProperties`.
+
+Usage: python notebooks/openapi.py [METHOD PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+REPO = Path(__file__).resolve().parent.parent
+SPEC = REPO / "swagger.yaml"
+CACHE = REPO / "notebooks" / ".cache"
+
+METHODS = ("get", "post", "put", "patch", "delete")
+
+# A validator takes a value and where it sits, and returns what is wrong with it.
+Validator = Callable[[Any, str], list[str]]
+
+
+class Unknown:
+    """A value only known at run time. It satisfies any schema."""
+
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+
+UNKNOWN = Unknown()
+
+
+class Open(dict):
+    """A dict that may hold more keys than it shows, such as one built with `**options`."""
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_path(raw: bytes) -> Path:
+    key = digest(raw + Path(__file__).resolve().read_bytes())
+    return CACHE / f"swagger-{key[:16]}.json"
+
+
+def parse(raw: bytes) -> dict:
+    """Read the spec the way YAML 1.2 tools do.
+
+    PyYAML follows YAML 1.1, where an unquoted `off` is false and `16:9` is a
+    base-60 integer. The spec means both as strings, so booleans and integers
+    are resolved by the 1.2 core schema instead.
+    """
+    import yaml
+
+    base = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    class Loader(base):  # type: ignore[misc, valid-type]
+        pass
+
+    replaced = ("tag:yaml.org,2002:bool", "tag:yaml.org,2002:int")
+    Loader.yaml_implicit_resolvers = {
+        first: [(tag, pattern) for tag, pattern in resolvers if tag not in replaced]
+        for first, resolvers in base.yaml_implicit_resolvers.items()
+    }
+    Loader.add_implicit_resolver(
+        replaced[0], re.compile(r"^(?:true|True|TRUE|false|False|FALSE)$"), list("tTfF")
+    )
+    Loader.add_implicit_resolver(
+        replaced[1], re.compile(r"^(?:[-+]?[0-9]+|0o[0-7]+|0x[0-9a-fA-F]+)$"), list("-+0123456789")
+    )
+    return yaml.load(raw, Loader=Loader)
+
+
+def stamp(value: Any) -> str:
+    # YAML reads unquoted timestamps in examples as datetimes.
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def document(path: Path = SPEC) -> dict:
+    """The parsed spec, from the cache when it was written for these exact bytes."""
+    raw = path.read_bytes()
+    cached = cache_path(raw)
+    if cached.exists():
+        try:
+            return json.loads(cached.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+
+    spec = json.loads(json.dumps(parse(raw), default=stamp))
+    CACHE.mkdir(parents=True, exist_ok=True)
+    for old in CACHE.glob("swagger-*.json"):
+        old.unlink()
+    partial = cached.with_suffix(".tmp")
+    partial.write_text(json.dumps(spec, separators=(",", ":")), encoding="utf-8")
+    partial.replace(cached)
+    return spec
+
+
+def target(spec: dict, ref: str) -> Any:
+    """The node a local `$ref` such as `#/components/schemas/Model` points at."""
+    node: Any = spec
+    for part in ref.lstrip("#/").split("/"):
+        node = node[part]
+    return node
+
+
+def deref(spec: dict, node: Any) -> Any:
+    """`node` with any chain of `$ref`s followed to what they name."""
+    while isinstance(node, dict) and "$ref" in node:
+        node = target(spec, node["$ref"])
+    return node
+
+
+def kind_of(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, (list, tuple)):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def is_kind(value: Any, kind: str) -> bool:
+    actual = kind_of(value)
+    return actual == kind or (kind == "number" and actual == "integer")
+
+
+class Compiler:
+    """Turns schemas into validators, compiling each `$ref` target once."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.refs: dict[str, Validator] = {}
+
+    def compile(self, schema: Any) -> Validator:
+        if not isinstance(schema, dict):
+            return lambda value, at: []
+        if "$ref" in schema:
+            ref = schema["$ref"]
+            if ref not in self.refs:
+                # Placeholder while the target compiles, for schemas that nest themselves.
+                self.refs[ref] = lambda value, at: []
+                self.refs[ref] = self.compile(target(self.spec, ref))
+            refs = self.refs
+            return lambda value, at: refs[ref](value, at)
+
+        checks: list[Validator] = []
+        kinds = schema.get("type")
+        kinds = [kinds] if isinstance(kinds, str) else list(kinds or [])
+        nullable = schema.get("nullable") or "null" in kinds
+
+        if kinds:
+            def check_type(value: Any, at: str) -> list[str]:
+                if any(is_kind(value, k) for k in kinds):
+                    return []
+                return [f"{at}: expected {' or '.join(kinds)}, got {kind_of(value)}"]
+
+            checks.append(check_type)
+        if "enum" in schema:
+            allowed = [v for v in schema["enum"] if v is not None]
+
+            def check_enum(value: Any, at: str) -> list[str]:
+                if value in allowed:
+                    return []
+                more = " ..." if len(allowed) > 8 else ""
+                return [f"{at}: {value!r} is not one of {allowed[:8]}{more}"]
+
+            checks.append(check_enum)
+        if "const" in schema:
+            const = schema["const"]
+            checks.append(lambda value, at: [] if value == const else [f"{at}: must be {const!r}"])
+        checks.extend(self.bounds(schema))
+        if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+            checks.append(self.object(schema))
+        if "items" in schema:
+            checks.append(self.array(schema["items"]))
+        if schema.get("allOf"):
+            parts = [self.compile(part) for part in schema["allOf"]]
+            checks.append(lambda value, at: [e for part in parts for e in part(value, at)])
+        for key in ("anyOf", "oneOf"):
+            if schema.get(key):
+                checks.append(self.alternatives(schema[key]))
+
+        def validate(value: Any, at: str) -> list[str]:
+            if value is UNKNOWN or (value is None and nullable):
+                return []
+            errors: list[str] = []
+            for check in checks:
+                errors.extend(check(value, at))
+                if errors:
+                    break
+            return errors
+
+        return validate
+
+    def bounds(self, schema: dict) -> list[Validator]:
+        checks: list[Validator] = []
+        numeric = [
+            ("minimum", lambda v, b: v >= b, ">="),
+            ("maximum", lambda v, b: v <= b, "<="),
+            ("exclusiveMinimum", lambda v, b: v > b, ">"),
+            ("exclusiveMaximum", lambda v, b: v < b, "<"),
+        ]
+        for key, within, sign in numeric:
+            if isinstance(schema.get(key), (int, float)) and not isinstance(schema[key], bool):
+                bound = schema[key]
+
+                def check_number(value: Any, at: str, bound=bound, within=within,
+                                 sign=sign) -> list[str]:
+                    if kind_of(value) in ("integer", "number") and not within(value, bound):
+                        return [f"{at}: {value!r} is not {sign} {bound}"]
+                    return []
+
+                checks.append(check_number)
+        sized = [
+            ("minLength", str, lambda n, b: n >= b), ("maxLength", str, lambda n, b: n <= b),
+            ("minItems", (list, tuple), lambda n, b: n >= b),
+            ("maxItems", (list, tuple), lambda n, b: n <= b),
+        ]
+        for key, types, within in sized:
+            if key in schema:
+                limit = schema[key]
+
+                def check_size(value: Any, at: str, key=key, limit=limit, types=types,
+                               within=within) -> list[str]:
+                    if isinstance(value, types) and not within(len(value), limit):
+                        return [f"{at}: length {len(value)} breaks {key} {limit}"]
+                    return []
+
+                checks.append(check_size)
+        if "pattern" in schema:
+            pattern = re.compile(schema["pattern"])
+
+            def check_pattern(value: Any, at: str) -> list[str]:
+                if isinstance(value, str) and not pattern.search(value):
+                    return [f"{at}: {value!r} does not match {pattern.pattern!r}"]
+                return []
+
+            checks.append(check_pattern)
+        return checks
+
+    def object(self, schema: dict) -> Validator:
+        properties = {
+            name: self.compile(prop) for name, prop in schema.get("properties", {}).items()
+        }
+        required = list(schema.get("required", []))
+        extra = schema.get("additionalProperties", True)
+        others = self.compile(extra) if isinstance(extra, dict) else None
+
+        def check_object(value: Any, at: str) -> list[str]:
+            if not isinstance(value, dict):
+                return []
+            errors: list[str] = []
+            if not isinstance(value, Open):
+                missing = [name for name in required if name not in value]
+                errors.extend(f"{at}: missing required {name!r}" for name in missing)
+            for name, item in value.items():
+                where = f"{at}.{name}"
+                if name in properties:
+                    errors.extend(properties[name](item, where))
+                elif others is not None:
+                    errors.extend(others(item, where))
+                elif extra is False:
+                    errors.append(f"{where}: not a field the endpoint accepts")
+            return errors
+
+        return check_object
+
+    def array(self, items: Any) -> Validator:
+        item = self.compile(items)
+
+        def check_array(value: Any, at: str) -> list[str]:
+            if not isinstance(value, (list, tuple)):
+                return []
+            return [e for i, v in enumerate(value) for e in item(v, f"{at}[{i}]")]
+
+        return check_array
+
+    def alternatives(self, options: list) -> Validator:
+        branches = [self.compile(option) for option in options]
+
+        def check_any(value: Any, at: str) -> list[str]:
+            failures = []
+            for branch in branches:
+                errors = branch(value, at)
+                if not errors:
+                    return []
+                failures.append(errors)
+            # When only one alternative got past the top level, its complaint is the useful one.
+            top = f"{at}: "
+            near = [errors for errors in failures if not any(e.startswith(top) for e in errors)]
+            if len(near) == 1:
+                return near[0]
+            return [f"{at}: matches none of the {len(branches)} allowed shapes"]
+
+        return check_any
+
+
+class Operation:
+    def __init__(self, method: str, template: str, body: Validator | None, definition: dict):
+        self.method, self.template, self.body = method, template, body
+        # The operation as the spec writes it, responses and all.
+        self.definition = definition
+
+    def validate(self, payload: Any) -> list[str]:
+        """What is wrong with `payload` as this operation's JSON request body."""
+        return self.body(payload, "body") if self.body else []
+
+
+class Index:
+    """Every operation in the spec, found by method and concrete path."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        compiler = Compiler(spec)
+        self.routes: list[tuple[re.Pattern[str], dict[str, Operation]]] = []
+        for template, operations in spec.get("paths", {}).items():
+            pattern = re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(template))
+            methods = {}
+            for method, operation in operations.items():
+                if method not in METHODS:
+                    continue
+                body = self.deref(operation.get("requestBody", {}))
+                schema = body.get("content", {}).get("application/json", {}).get("schema")
+                methods[method] = Operation(method.upper(), template,
+                                            compiler.compile(schema) if schema else None,
+                                            operation)
+            self.routes.append((re.compile(f"^{pattern}$"), methods))
+        # Literal paths win over templated ones, so /api_keys/rate_limits is
+        # not swallowed by /api_keys/{id}.
+        self.routes.sort(key=lambda route: route[0].pattern.count("[^/]+"))
+
+    def find(self, method: str, path: str) -> Operation | None:
+        for pattern, methods in self.routes:
+            if pattern.match(path) and method.lower() in methods:
+                return methods[method.lower()]
+        return None
+
+    def deref(self, node: Any) -> Any:
+        return deref(self.spec, node)
+
+
+@functools.lru_cache(maxsize=None)
+def load(path: Path = SPEC) -> Index:
+    return Index(document(path))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("method", nargs="?", help="e.g. POST")
+    parser.add_argument("path", nargs="?", help="e.g. /audio/speech")
+    args = parser.parse_args()
+
+    index = load()
+    if not args.method:
+        operations = [op for _, methods in index.routes for op in methods.values()]
+        bodies = sum(1 for op in operations if op.body)
+        print(f"{len(operations)} operations, {bodies} with JSON bodies")
+        return 0
+    operation = index.find(args.method, args.path or "/")
+    if operation is None:
+        print(f"no operation serves {args.method.upper()} {args.path}", file=sys.stderr)
+        return 1
+    print(f"{operation.method} {operation.template}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
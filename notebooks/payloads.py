@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Check the request bodies the Python snippets send against swagger.yaml.
+
+Snippets hard-code the JSON they post, and nothing else notices when the API
+renames a field or narrows an enum under them. This finds each call that sends
+a `json=` body, through `requests`, a session, or a page's own `api()` or
+`request()` helper, works out the endpoint from its URL, and validates the body
+against that operation's schema in the compiled index from `openapi.py`.
+
+Nothing is executed. A body is evaluated from the source as far as it can be:
+literals, upper-case module constants defined anywhere on the page, and dicts
+bound to a name in the same block. Anything else, a parameter or a call, is
+unknown and passes, and a dict that spreads `**options` is not held to the
+fields it must have. Calls whose URL is not written out are skipped.
+
+`build.py --check` runs this over every English page and fails on any finding.
+
+Usage: python notebooks/payloads.py [page ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import sys
+import time
+from typing import Any
+
+import openapi
+from build import LOCALES
+from mock_api import LIVE_URL
+from snippets import FRAGMENT, english_pages, python_blocks, source
+
+HELPERS = ("request", "api")
+
+# Findings that are right about the spec and wrong about the API, because the
+# spec describes one schema where the endpoint applies per-model rules. Keyed
+# by page, request and finding, so anything new on the same page still fails.
+KNOWN = {
+    ("guides/media/reference-to-video.mdx", "POST /video/queue",
+     "body.duration: '8' is not one of ['1s', '2s', '3s', '4s', '5s', '6s', '7s', '8s'] ..."):
+        "reference-to-video models take durations without the unit",
+    ("guides/media/video-upscaling.mdx", "POST /video/queue", "body: missing required 'prompt'"):
+        "upscale models take no prompt",
+    ("guides/media/video-upscaling.mdx", "POST /video/queue", "body: missing required 'duration'"):
+        "upscale models read the duration from the video",
+}
+
+
+def evaluate(node: ast.AST | None, names: dict[str, Any]) -> Any:
+    """The value `node` holds wherever it can be told from the source, else UNKNOWN."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = evaluate(node.operand, names)
+        return -value if openapi.kind_of(value) in ("integer", "number") else openapi.UNKNOWN
+    if isinstance(node, ast.Name):
+        return names.get(node.id, openapi.UNKNOWN)
+    if isinstance(node, (ast.List, ast.Tuple)):
+        if any(isinstance(item, ast.Starred) for item in node.elts):
+            return openapi.UNKNOWN
+        return [evaluate(item, names) for item in node.elts]
+    if isinstance(node, ast.Dict):
+        fields: dict[str, Any] = {}
+        complete = True
+        for key, value in zip(node.keys, node.values):
+            if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                fields[key.value] = evaluate(value, names)
+            else:
+                complete = False
+        return fields if complete else openapi.Open(fields)
+    return openapi.UNKNOWN
+
+
+def constants(trees: list[ast.Module]) -> dict[str, Any]:
+    """Upper-case names a page assigns a fully known value at module level."""
+    names: dict[str, Any] = {}
+    for tree in trees:
+        for statement in tree.body:
+            if not (isinstance(statement, ast.Assign) and len(statement.targets) == 1):
+                continue
+            target = statement.targets[0]
+            if isinstance(target, ast.Name) and target.id.isupper():
+                value = evaluate(statement.value, names)
+                if value is not openapi.UNKNOWN:
+                    names[target.id] = value
+    return names
+
+
+def bound_dicts(tree: ast.Module) -> dict[str, ast.Dict]:
+    """Names assigned a dict literal exactly once in a block, such as `payload = {...}`."""
+    seen: dict[str, list[ast.AST]] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    seen.setdefault(target.id, []).append(node.value)
+    return {
+        name: values[0] for name, values in seen.items()
+        if len(values) == 1 and isinstance(values[0], ast.Dict)
+    }
+
+
+def path_of(node: ast.AST | None) -> str | None:
+    """The API path a URL expression names, with run-time parts as `{}`."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        text = node.value
+    elif isinstance(node, ast.JoinedStr):
+        parts = []
+        for i, part in enumerate(node.values):
+            if isinstance(part, ast.Constant):
+                parts.append(str(part.value))
+            elif i:
+                parts.append("{}")
+        # A leading placeholder is the base URL.
+        text = "".join(parts)
+    else:
+        return None
+    text = text.removeprefix(LIVE_URL).split("?")[0]
+    return text if text.startswith("/") and len(text) > 1 else None
+
+
+def endpoint(call: ast.Call) -> tuple[str, str] | None:
+    """The method and path a call sends to, when the call reads as an HTTP request."""
+    func = call.func
+    name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+    url = next((k.value for k in call.keywords if k.arg == "url"), None)
+    if name in openapi.METHODS:
+        method = name.upper()
+        url = call.args[0] if call.args else url
+    elif name in HELPERS and call.args and isinstance(call.args[0], ast.Constant):
+        method = str(call.args[0].value).upper()
+        url = call.args[1] if len(call.args) > 1 else url
+    else:
+        return None
+    path = path_of(url)
+    return (method, path) if method.lower() in openapi.METHODS and path else None
+
+
+def check_page(page: str, index: openapi.Index) -> tuple[int, list[str]]:
+    """How many bodies on `page` were checked, and what is wrong with them."""
+    parsed = []
+    for block in python_blocks(page):
+        try:
+            parsed.append((block, ast.parse(source(block.code))))
+        except SyntaxError:
+            continue
+    names = constants([tree for _, tree in parsed])
+
+    checked, problems = 0, []
+    for block, tree in parsed:
+        dicts = bound_dicts(tree)
+        offset = block.line - (FRAGMENT.count("\n") if block.code[:1].isspace() else 0)
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            body = next((k.value for k in node.keywords if k.arg == "json"), None)
+            target = endpoint(node) if body is not None else None
+            if target is None:
+                continue
+            if isinstance(body, ast.Name):
+                body = dicts.get(body.id)
+            if not isinstance(body, ast.Dict):
+                continue
+
+            method, path = target
+            where = f"{page}:{offset + node.lineno} {method} {path}"
+            operation = index.find(method, path)
+            if operation is None:
+                problems.append(f"{where}: swagger.yaml has no such operation")
+                continue
+            checked += 1
+            errors = operation.validate(evaluate(body, names))
+            problems.extend(
+                f"{where}: {error}" for error in errors
+                if (page, f"{method} {path}", error) not in KNOWN
+            )
+    return checked, problems
+
+
+def check(pages: list[str]) -> tuple[int, list[str]]:
+    index = openapi.load()
+    checked, problems = 0, []
+    for page in pages:
+        count, found = check_page(page, index)
+        checked += count
+        problems.extend(found)
+    return checked, problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="*", help="pages to check, default every English page")
+    args = parser.parse_args()
+
+    pages = [p for p in args.pages if p.split("/", 1)[0] not in LOCALES] or english_pages()
+    started = time.perf_counter()
+    checked, problems = check(pages)
+    for problem in problems:
+        print(problem)
+    wall = time.perf_counter() - started
+    print(f"\n{checked} request bodies checked across {len(pages)} pages in {wall:.2f}s",
+          file=sys.stderr if problems else sys.stdout)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""Build a static full-text and code search index over every MDX page.
+
+Site search covers the model catalog and little else. This indexes all of it:
+each page is split at its `##` and `###` headings into sections, and each
+section is indexed by its heading, its prose and the identifiers in its code
+blocks, as `build.sections` walks it for the notebooks.
+Headings weigh more than prose and code symbols more than prose, so a search
+for `response_format` lands on the sections whose code sets it.
+
+Words are lowercased runs of letters and digits. Chinese, Japanese and Korean
+text, which does not separate words the same way, is indexed as overlapping
+pairs of characters. Code identifiers are indexed whole and by their
+`snake_case` and `camelCase` parts, so `max_completion_tokens` is found by
+`completion` as well.
+
+The index is written per locale under `search-index/<locale>/`. `docs.json`
+lists the sections, and `terms/` splits the postings into shards by the first
+character of the term, so a client answering a query loads the docs list and
+one shard per query word, and can complete a word it has the start of. Letters
+outside ASCII share 64 shards, `u` and their code point modulo 64. A shard maps
+each term to a flat list of `[doc, weight, doc, weight, ...]`, doc ids
+delta-encoded in ascending order.
+
+Rebuilds are incremental. What each page contributed is cached under
+`notebooks/.cache/search/`, keyed by a hash of the page, so only edited pages
+are read again, only locales with an edited page are reassembled, and only the
+shard files whose bytes changed are rewritten.
+
+Usage: python notebooks/search_index.py [--force] [--out DIR]
+       python notebooks/search_index.py --query "stream speech" [--locale de]
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from build import LOCALES, REPO, Section, sections
+from snippets import mdx_files
+
+OUT = REPO / "search-index"
+CACHE = REPO / "notebooks" / ".cache" / "search"
+
+# How much one occurrence counts, by where it appears.
+TITLE, HEADING_WEIGHT, SYMBOL, TEXT = 8, 4, 2, 1
+SNIPPET = 160
+# Characters outside ASCII share this many shards, by code point.
+UNICODE_SHARDS = 64
+
+WORD = re.compile(r"[^\W_]+")
+CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]+")
+IDENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+TITLE_FIELD = re.compile(r"^title:\s*(.+?)\s*$")
+ATTRIBUTE = re.compile(r"\b(?:title|description)=\"([^\"]*)\"")
+TAG = re.compile(r"</?[A-Za-z][^>]*/?>")
+LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+INLINE_CODE = re.compile(r"`([^`\n]+)`")
+MARKUP = re.compile(r"[*_#>|]+")
+
+
+def words(text: str) -> list[str]:
+    """The searchable words in `text`, with CJK runs split into character pairs."""
+    text = text.lower()
+    if not CJK.search(text):
+        return [w for w in WORD.findall(text) if len(w) > 1 or w.isdigit()]
+    out = []
+    for match in WORD.finditer(text):
+        word = match.group()
+        start = 0
+        for run in CJK.finditer(word):
+            out.extend(w for w in (word[start:run.start()],) if len(w) > 1)
+            chars = run.group()
+            out.extend([chars] if len(chars) == 1 else
+                       [chars[i:i + 2] for i in range(len(chars) - 1)])
+            start = run.end()
+        rest = word[start:]
+        if len(rest) > 1 or rest.isdigit():
+            out.append(rest)
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def parts(ident: str) -> tuple[str, ...]:
+    """An identifier, lowercased, then its snake and camel case parts if it has several."""
+    pieces = [p.lower() for piece in ident.split("_") for p in CAMEL.findall(piece)]
+    extra = tuple(p for p in pieces if len(p) > 1) if len(pieces) > 1 else ()
+    return (ident.lower(), *extra)
+
+
+def symbols(code: str) -> list[str]:
+    """Identifiers in `code`, whole and split into their parts."""
+    return [part for ident in IDENT.findall(code) for part in parts(ident)]
+
+
+def slug(title: str) -> str:
+    """The anchor Mintlify gives a heading."""
+    text = INLINE_CODE.sub(r"\1", LINK.sub(r"\1", title)).lower()
+    return re.sub(r"[^\w\- ]", "", text).strip().replace(" ", "-")
+
+
+def prose(mdx: str) -> tuple[str, str]:
+    """MDX as plain text, and the inline code it quotes."""
+    quoted = " ".join(INLINE_CODE.findall(mdx))
+    mdx = " ".join(ATTRIBUTE.findall(mdx)) + " " + TAG.sub(" ", mdx)
+    mdx = MARKUP.sub(" ", INLINE_CODE.sub(r"\1", LINK.sub(r"\1", mdx)))
+    return " ".join(mdx.split()), quoted
+
+
+def page_title(src: str) -> str:
+    """The `title` in a page's frontmatter."""
+    lines = src.splitlines()
+    if lines[:1] == ["---"] and "---" in lines[1:]:
+        for line in lines[1:lines.index("---", 1)]:
+            field = TITLE_FIELD.match(line)
+            if field:
+                return field.group(1).strip("\"'")
+    return ""
+
+
+def entry(section: Section, title: str) -> list:
+    """`[anchor, heading, snippet, terms]`, what a section adds to the index."""
+    heading = prose(section.title)[0] if section.level else ""
+    lines = [line for line in section.lines if not line.lstrip().startswith(("import ", "export "))]
+    text, quoted = prose("\n".join(lines))
+    weights: Counter[str] = Counter()
+    for word in words(title if not section.level else ""):
+        weights[word] += TITLE
+    for word in words(heading or title):
+        weights[word] += HEADING_WEIGHT
+    for word in words(text):
+        weights[word] += TEXT
+    for symbol in symbols("\n".join(b.code for b in section.blocks) + "\n" + quoted):
+        weights[symbol] += SYMBOL
+    anchor = slug(section.title) if section.level else ""
+    return [anchor, heading or title, text[:SNIPPET], dict(weights)]
+
+
+def extract(src: bytes) -> dict:
+    """What a page adds to the index: its title and an entry per section."""
+    text = src.decode("utf-8")
+    title = page_title(text)
+    kept = [s for s in sections(text) if s.level or s.blocks or any(
+        line.strip() and not line.lstrip().startswith(("import ", "export ")) for line in s.lines)]
+    return {"title": title, "sections": [entry(s, title) for s in kept]}
+
+
+def locale_of(page: str) -> str:
+    first = page.split("/", 1)[0]
+    return first if first in LOCALES else "en"
+
+
+def all_pages() -> list[str]:
+    listed = mdx_files()
+    return [page for page in listed if not page.startswith("snippets/")]
+
+
+def shard_of(term: str) -> str:
+    """The shard a term lives in: its first character, or a bucket of them outside ASCII."""
+    first = term[:1]
+    return first if first.isascii() else f"u{ord(first) % UNICODE_SHARDS}"
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write(path: Path, text: str) -> bool:
+    """Write `text` unless `path` already holds it. True when it wrote."""
+    data = text.encode("utf-8")
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+def assemble(locale: str, pages: dict[str, dict], out: Path) -> tuple[int, int, int]:
+    """Write one locale's docs list and term shards. Returns docs, shards, files written."""
+    docs: list[list] = []
+    postings: dict[str, list[tuple[int, int]]] = {}
+    for page in sorted(pages):
+        url = "/" + page.removesuffix(".mdx").removesuffix("/index")
+        for anchor, heading, snippet, terms in pages[page]["sections"]:
+            doc = len(docs)
+            docs.append([url, anchor, pages[page]["title"], heading, snippet])
+            for term, weight in terms.items():
+                postings.setdefault(term, []).append((doc, weight))
+
+    shards: dict[str, dict[str, list[int]]] = {}
+    for term in sorted(postings):
+        flat, previous = [], 0
+        for doc, weight in postings[term]:
+            flat += [doc - previous, weight]
+            previous = doc
+        shards.setdefault(shard_of(term), {})[term] = flat
+
+    root = out / locale
+    written = int(write(root / "docs.json", json.dumps(
+        {"docs": docs, "shards": sorted(shards)}, ensure_ascii=False, separators=(",", ":"))))
+    for name, terms in shards.items():
+        text = json.dumps(terms, ensure_ascii=False, separators=(",", ":"))
+        written += write(root / "terms" / f"{name}.json", text)
+    for stale in (root / "terms").glob("*.json"):
+        if stale.stem not in shards:
+            stale.unlink()
+            written += 1
+    return len(docs), len(shards), written
+
+
+def build(out: Path = OUT, force: bool = False) -> list[str]:
+    """Bring the index under `out` up to date, reading only pages that changed."""
+    # Pages are walked by build.py, so a change there can change what they add.
+    version = digest(Path(__file__).resolve().read_bytes() + (REPO / "notebooks" / "build.py").read_bytes())[:16]
+    by_locale: dict[str, list[str]] = {}
+    for page in all_pages():
+        by_locale.setdefault(locale_of(page), []).append(page)
+
+    report = []
+    for locale, pages in sorted(by_locale.items()):
+        cache_file = CACHE / f"{locale}.json"
+        cached: dict = {}
+        if cache_file.exists() and not force:
+            try:
+                cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                cached = {}
+        entries = cached.get("pages", {}) if cached.get("version") == version else {}
+
+        current, read = {}, 0
+        for page in pages:
+            src = (REPO / page).read_bytes()
+            page_hash = digest(src)
+            entry = entries.get(page)
+            if entry is None or entry["hash"] != page_hash:
+                entry = {"hash": page_hash, **extract(src)}
+                read += 1
+            current[page] = entry
+
+        if not read and set(current) == set(entries) and (out / locale / "docs.json").exists():
+            report.append(f"{locale}: up to date, {len(current)} pages")
+            continue
+        docs, shards, written = assemble(locale, current, out)
+        CACHE.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"version": version, "pages": current},
+                                         ensure_ascii=False), encoding="utf-8")
+        report.append(f"{locale}: read {read} of {len(current)} pages, {docs} sections, "
+                      f"{shards} shards, {written} files written")
+    return report
+
+
+class Searcher:
+    """Answers queries against one locale of a built index, loading shards as needed."""
+
+    def __init__(self, locale: str = "en", root: Path = OUT):
+        self.root = root / locale
+        index = json.loads((self.root / "docs.json").read_text(encoding="utf-8"))
+        self.docs = index["docs"]
+        self.available = set(index["shards"])
+        self.shards: dict[str, dict[str, list[int]]] = {}
+
+    def postings(self, term: str, prefix: bool = False) -> dict[int, int]:
+        name = shard_of(term)
+        if name not in self.available:
+            return {}
+        if name not in self.shards:
+            self.shards[name] = json.loads(
+                (self.root / "terms" / f"{name}.json").read_text(encoding="utf-8"))
+        found: dict[int, int] = {}
+        shard = self.shards[name]
+        for candidate in [t for t in shard if t.startswith(term)] if prefix else [term]:
+            doc = 0
+            flat = shard.get(candidate, [])
+            for i in range(0, len(flat), 2):
+                doc += flat[i]
+                found[doc] = max(found.get(doc, 0), flat[i + 1])
+        return found
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[float, list]]:
+        """Sections matching every word of `query`, the last as a prefix, best first.
+
+        Falls back to sections matching any word when none match all of them.
+        """
+        terms = list(dict.fromkeys(words(query)))
+        if not terms:
+            return []
+        lists = [self.postings(t, prefix=(i == len(terms) - 1 and len(t) > 1))
+                 for i, t in enumerate(terms)]
+        scores: dict[int, float] = {}
+        hits: Counter[int] = Counter()
+        for found in lists:
+            idf = math.log(1 + len(self.docs) / (1 + len(found)))
+            for doc, weight in found.items():
+                scores[doc] = scores.get(doc, 0.0) + idf * (1 + math.log(weight))
+                hits[doc] += 1
+        every = [doc for doc in scores if hits[doc] == len(lists)]
+        ranked = sorted(every or scores, key=lambda doc: -scores[doc])[:limit]
+        return [(round(scores[doc], 3), self.docs[doc]) for doc in ranked]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", type=Path, default=OUT, help="where to write the index")
+    parser.add_argument("--force", action="store_true", help="read every page again")
+    parser.add_argument("--query", help="search the built index instead of building it")
+    parser.add_argument("--locale", default="en", help="locale to search, with --query")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.query:
+        searcher = Searcher(args.locale, args.out)
+        loaded = time.perf_counter()
+        results = searcher.search(args.query, args.limit)
+        done = time.perf_counter()
+        try:
+            for score, (url, anchor, title, heading, _) in results:
+                where = f"{url}#{anchor}  {title} > {heading}" if anchor else f"{url}  {title}"
+                print(f"{score:7.2f}  {where}")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader, such as `head`, has seen enough. Point stdout at devnull so
+            # the flush at exit does not raise again.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+        print(f"\n{len(results)} results, {len(searcher.shards)} shards loaded, docs list "
+              f"{(loaded - started) * 1000:.1f} ms, query {(done - loaded) * 1000:.1f} ms",
+              file=sys.stderr)
+        return 0
+
+    for line in build(args.out, args.force):
+        print(line)
+    print(f"\nindexed in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
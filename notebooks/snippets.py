@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Compile, and optionally run, every Python block in the docs.
+
+Only the pages with notebooks are ever executed by hand. This checks the rest:
+each ```python block, found with the same parser `build.py` uses, must at least
+compile. Blocks that start indented are method excerpts from a class shown
+earlier on the page, so they are compiled as a class body.
+
+With `--run`, each page executes as one program, block by block in reading
+order, since later blocks lean on names defined by earlier ones. Requests go to
+the stand-in server in `mock_api.py` rather than the live API, pages run in
+parallel in their own processes and scratch directories, and every block is
+timed. Failures are expected for blocks that need files, packages or services
+the page assumes you already have. `EXPECTED_FAILURES` counts them per page,
+with the reason, and the run exits non-zero when a page fails more blocks than
+that, so a block that used to pass cannot start failing unnoticed.
+
+Usage: python notebooks/snippets.py [--run] [--jobs N] [--json out.json] [page ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import asyncio
+import inspect
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from build import LOCALES, REPO, Block, page_blocks
+
+FLAGS = ast.PyCF_ALLOW_TOP_LEVEL_AWAIT
+FRAGMENT = "class _Fragment:\n"
+
+# How many blocks on a page `--run` expects to fail, and why. A page failing
+# more than this, or a page not listed failing at all, fails the run. Blocks
+# after a failed one often fail with NameError for the names it never defined.
+EXPECTED_FAILURES: dict[str, tuple[int, str]] = {
+    "api-reference/api-spec.mdx": (2, "needs openai"),
+    "getting-started/quick-start.mdx": (4, "needs openai"),
+    "guides/features/characters.mdx": (1, "needs openai"),
+    "guides/features/embeddings.mdx": (1, "needs openai"),
+    "guides/features/file-inputs.mdx": (1, "needs openai"),
+    "guides/features/function-calling.mdx": (2, "needs openai"),
+    "guides/features/reasoning-models.mdx": (4, "uses a client the page never creates"),
+    "guides/features/tee-e2ee-models.mdx": (8, "needs openai and an attested enclave"),
+    "guides/features/vision.mdx": (1, "needs openai"),
+    "guides/getting-started/openai-migration.mdx": (2, "needs openai"),
+    "guides/integrations/crewai.mdx": (5, "needs crewai"),
+    "guides/integrations/langchain.mdx": (10, "needs langchain"),
+    "guides/integrations/livekit-agents.mdx": (6, "needs livekit"),
+    "guides/integrations/llamaindex.mdx": (11, "needs llama-index"),
+    "guides/integrations/pydanticai.mdx": (9, "needs pydantic-ai"),
+    "guides/media/article-narration.mdx": (5, "imports the page's narrate.py as a module"),
+    "guides/media/image-editing.mdx": (1, "reads input.jpg"),
+    "guides/media/image-generation.mdx": (1, "the stand-in's image is not base64"),
+    "guides/media/image-upscaling.mdx": (1, "reads input.jpg"),
+    "guides/media/meeting-notes.mdx": (4, "reads standup.wav"),
+    "guides/media/music-and-sound-effects.mdx": (1, "polls a queue the stand-in never finishes"),
+    "guides/media/prompt-enhancement.mdx": (1, "the stand-in's image is not base64"),
+    "guides/media/reference-to-video.mdx": (2, "reads fields the stand-in does not return"),
+    "guides/media/speech-to-text.mdx": (1, "reads meeting.mp3"),
+    "guides/media/video-generation.mdx": (1, "polls a queue the stand-in never finishes"),
+    "guides/media/video-upscaling.mdx": (1, "polls a queue the stand-in never finishes"),
+    "guides/tools/document-extraction.mdx": (2, "reads paper.pdf"),
+    "learn/audio-research-notebook.mdx": (1, "builds the ANN index before any source is added"),
+    "learn/private-rag-bot.mdx": (9, "needs fastembed"),
+    "learn/private-research-agent.mdx": (25, "needs httpx and pydantic"),
+    "learn/security-code-reviewer.mdx": (12, "needs python-dotenv"),
+    "overview/about-venice.mdx": (1, "needs openai"),
+}
+
+
+def mdx_files() -> list[str]:
+    """Every MDX file in the repository, relative to it, as git tracks them."""
+    try:
+        return subprocess.run(
+            ["git", "ls-files", "*.mdx"], cwd=REPO, capture_output=True, text=True, check=True
+        ).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        # An exported tree or a machine without git: read the working tree instead.
+        found = (path.relative_to(REPO) for path in REPO.glob("**/*.mdx"))
+        return sorted(path.as_posix() for path in found
+                      if not any(part.startswith(".") or part == "node_modules"
+                                 for part in path.parts))
+
+
+def english_pages() -> list[str]:
+    listed = mdx_files()
+    # Snippets are checked through the pages that import them.
+    return [page for page in listed if page.split("/", 1)[0] not in (*LOCALES, "snippets")]
+
+
+def python_blocks(page: str) -> list[Block]:
+    return [b for b in page_blocks(REPO / page) if b.lang == "python"]
+
+
+def source(code: str) -> str:
+    """The code as it has to be compiled: method excerpts go inside a class."""
+    return FRAGMENT + code if code[:1].isspace() else code
+
+
+def compile_block(page: str, block: Block, code: str | None = None):
+    code = source(block.code if code is None else code)
+    return compile(code, f"{page}:{block.line}", "exec", flags=FLAGS, dont_inherit=True)
+
+
+def check(page: str) -> list[dict]:
+    results = []
+    for block in python_blocks(page):
+        result = {"page": page, "line": block.line, "section": block.section}
+        try:
+            compile_block(page, block)
+            result["status"] = "ok"
+        except SyntaxError as error:
+            result |= {"status": "syntax", "error": f"{error.msg} (line {error.lineno})"}
+        results.append(result)
+    return results
+
+
+def expire(signum, frame):
+    raise TimeoutError("block timed out")
+
+
+def execute(page: str, base_url: str, timeout: int) -> list[dict]:
+    """Run a page's blocks in one namespace, in order. Called inside a worker."""
+    namespace: dict = {"__name__": "snippet"}
+    owner = None
+    results = []
+    signal.signal(signal.SIGALRM, expire)
+
+    for block in python_blocks(page):
+        result = {"page": page, "line": block.line, "section": block.section}
+        code = block.code.replace("https://api.venice.ai/api/v1", base_url)
+        fragment = code[:1].isspace()
+        start = time.perf_counter()
+        try:
+            compiled = compile_block(page, block, code)
+            signal.alarm(timeout)
+            try:
+                outcome = eval(compiled, namespace)
+                if inspect.iscoroutine(outcome):
+                    asyncio.run(outcome)
+            finally:
+                signal.alarm(0)
+            if fragment and owner in namespace:
+                # Attach the excerpted methods to the class they were cut from.
+                for name, value in vars(namespace.pop("_Fragment")).items():
+                    if not name.startswith("__"):
+                        setattr(namespace[owner], name, value)
+            result["status"] = "ok"
+        except SyntaxError as error:
+            result |= {"status": "syntax", "error": f"{error.msg} (line {error.lineno})"}
+        except BaseException as error:
+            last = traceback.extract_tb(error.__traceback__)[-1]
+            result |= {
+                "status": "timeout" if isinstance(error, TimeoutError) else "error",
+                "error": f"{type(error).__name__}: {error}"[:300] + f" ({last.filename}:{last.lineno})",
+            }
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        results.append(result)
+
+        if result["status"] != "syntax" and not fragment:
+            classes = [n.name for n in ast.parse(code).body if isinstance(n, ast.ClassDef)]
+            owner = classes[-1] if classes else owner
+    return results
+
+
+def run(page: str, base_url: str, timeout: int) -> list[dict]:
+    """Execute one page in a fresh interpreter and scratch directory."""
+    env = os.environ | {"VENICE_API_KEY": "snippet-test-key", "PYTHONDONTWRITEBYTECODE": "1"}
+    with tempfile.TemporaryDirectory(prefix="snippet-") as scratch:
+        started = time.perf_counter()
+        try:
+            worker = subprocess.run(
+                [sys.executable, __file__, "--worker", page, "--base-url", base_url,
+                 "--timeout", str(timeout)],
+                cwd=scratch, env=env, stdin=subprocess.DEVNULL,
+                capture_output=True, text=True, timeout=timeout * max(1, len(python_blocks(page))),
+            )
+        except subprocess.TimeoutExpired:
+            return [{"page": page, "line": 0, "section": "", "status": "timeout",
+                     "error": "page timed out", "seconds": round(time.perf_counter() - started, 4)}]
+    lines = [line for line in worker.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return [{"page": page, "line": 0, "section": "", "status": "error",
+                 "error": worker.stderr.strip()[-300:] or "worker produced no results",
+                 "seconds": round(time.perf_counter() - started, 4)}]
+    return json.loads(lines[-1])["results"]
+
+
+def unexpected(results: list[dict]) -> list[str]:
+    """Pages with more failing blocks than `EXPECTED_FAILURES` allows them."""
+    failed: dict[str, int] = {}
+    for result in results:
+        if result["status"] != "ok":
+            failed[result["page"]] = failed.get(result["page"], 0) + 1
+    return [
+        f"{page}: {count} blocks failed, {EXPECTED_FAILURES.get(page, (0, ''))[0]} expected"
+        for page, count in sorted(failed.items())
+        if count > EXPECTED_FAILURES.get(page, (0, ""))[0]
+    ]
+
+
+def report(results: list[dict], wall: float, slowest: int = 10) -> None:
+    failed = [r for r in results if r["status"] != "ok"]
+    for result in failed:
+        print(f"{result['status']:8} {result['page']}:{result['line']}  {result.get('error', '')}")
+
+    timed = [r for r in results if "seconds" in r]
+    if timed:
+        print(f"\nslowest {min(slowest, len(timed))} blocks:")
+        for result in sorted(timed, key=lambda r: r["seconds"], reverse=True)[:slowest]:
+            print(f"  {result['seconds']:8.3f}s  {result['page']}:{result['line']}  {result['section']}")
+
+    pages = len({r["page"] for r in results})
+    print(f"\n{len(results) - len(failed)}/{len(results)} blocks ok across {pages} pages in {wall:.2f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="*", help="pages to check, default every English page")
+    parser.add_argument("--run", action="store_true", help="execute against the local stand-in")
+    parser.add_argument("--base-url", help="run against this API instead of starting the stand-in")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=int, default=30, help="seconds allowed per block")
+    parser.add_argument("--json", type=Path, help="write every result to this file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps({"results": execute(args.worker, args.base_url, args.timeout)}))
+        return 0
+
+    pages = [p for p in (args.pages or english_pages()) if python_blocks(p)]
+    started = time.perf_counter()
+    if args.run:
+        server = None
+        base_url = args.base_url
+        if not base_url:
+            import mock_api
+
+            server = mock_api.serve()
+            base_url = mock_api.base_url(server)
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            results = [r for page in pool.map(lambda p: run(p, base_url, args.timeout), pages)
+                       for r in page]
+        if server:
+            server.shutdown()
+    else:
+        results = [r for page in pages for r in check(page)]
+    wall = time.perf_counter() - started
+
+    report(results, wall)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=1) + "\n", encoding="utf-8")
+
+    syntax = [r for r in results if r["status"] == "syntax"]
+    if args.run:
+        regressions = unexpected(results)
+        for line in regressions:
+            print(f"unexpected failures in {line}", file=sys.stderr)
+        return 1 if syntax or regressions else 0
+    return 1 if syntax else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())